@@ -0,0 +1,306 @@
+# bench.py
+"""
+Benchmark suite for the cipher implementations in this repository.
+
+For every target it measures
+  * import time of the modules involved (fresh interpreter, best of N),
+  * key-setup cost (where the cipher has a key schedule),
+  * per-call latency and blocks per second for several batch sizes.
+A batch of n blocks is one call for the batch engines and n calls for the
+single-block ones.
+
+Each target runs in its own child process, so modules with clashing names
+(implementation/saturnin.py and Brownie_server/saturnin.py) never meet and
+every import is cold. Results are written as JSON; --compare checks them
+against a stored baseline and flags every metric that got worse by more
+than --threshold.
+
+Usage:
+    python3 benchmarks/bench.py --output results.json
+    python3 benchmarks/bench.py --targets saturnin,toy --sizes 1,64 --compare baseline.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = [1, 16, 256, 4096]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+
+SATURNIN_R, SATURNIN_D = 10, 6
+TOY_R = 3
+
+# ------------------- Module loading -------------------
+
+def load(directory: str, name: str):
+    """Import 'name' with ROOT/directory first on sys.path, so sibling imports resolve."""
+    sys.path.insert(0, os.path.join(ROOT, directory))
+    return importlib.import_module(name)
+
+# ------------------- Targets -------------------
+# A target has an 'imports' function (the part that is timed as import
+# cost) and a 'prepare' function that turns the imported modules into
+#   run(n)      process n blocks
+#   key_setup() build one key context, or None if there is no schedule.
+
+class Skip(Exception):
+    """Raised by prepare() when a target cannot run here."""
+
+TARGETS = {}
+
+def target(name: str, description: str, imports):
+    def register(prepare):
+        TARGETS[name] = (description, imports, prepare)
+        return prepare
+    return register
+
+KEY = bytes(range(32))
+BLOCK = bytes(range(16)) + b"\x80" + b"\x00" * 15
+
+def _scalar(fn):
+    def run(n: int):
+        for _ in range(n):
+            fn()
+    return run
+
+@target("saturnin", "implementation/saturnin.py, one block per call",
+        lambda: load("implementation", "saturnin"))
+def _saturnin(mod):
+    run = _scalar(lambda: mod.saturnin_block_encrypt(SATURNIN_R, SATURNIN_D, KEY, BLOCK))
+    return run, lambda: mod.SaturninKey(KEY, SATURNIN_R, SATURNIN_D)
+
+@target("saturnin-swar", "implementation/saturnin_swar.py, one block per call",
+        lambda: load("implementation", "saturnin_swar"))
+def _saturnin_swar(mod):
+    run = _scalar(lambda: mod.saturnin_block_encrypt(SATURNIN_R, SATURNIN_D, KEY, BLOCK))
+    return run, lambda: mod.SwarKey(KEY, SATURNIN_R, SATURNIN_D)
+
+def _batch_runner(encrypt_batch, np):
+    blocks = {}
+
+    def run(n: int):
+        if n not in blocks:
+            blocks[n] = np.frombuffer(BLOCK * n, dtype=np.uint8).reshape(n, 32)
+        encrypt_batch(SATURNIN_R, SATURNIN_D, KEY, blocks[n])
+    return run
+
+@target("saturnin-batch", "implementation/saturnin_batch.py, n blocks per call",
+        lambda: load("implementation", "saturnin_batch"))
+def _saturnin_batch(mod):
+    return _batch_runner(mod.saturnin_block_encrypt_batch, mod.np), None
+
+@target("saturnin-native", "saturnin.c via implementation/saturnin_native.py, n blocks per call",
+        lambda: load("implementation", "saturnin_native"))
+def _saturnin_native(mod):
+    if not mod.available():
+        raise Skip("native library not available")
+    return _batch_runner(mod.saturnin_block_encrypt_batch, mod.np), None
+
+@target("toy", f"toy/toy.py encrypt_toy_debug, R={TOY_R}",
+        lambda: load("", "toy.toy"))
+def _toy(mod):
+    pt, key = [1, 2, 3, 4, 5, 6, 7, 8], [0xA, 1, 0xB, 2, 0xC, 3, 0xD, 4]
+    return _scalar(lambda: mod.encrypt_toy_debug(pt, key, R=TOY_R)), \
+        lambda: mod.make_round_constants(TOY_R)
+
+@target("toy-table", f"toy/toy_table.py packed 32-bit T-table engine, R={TOY_R}",
+        lambda: load("", "toy.toy_table"))
+def _toy_table(mod):
+    key = mod.toy_key(0xA1B2C3D4, TOY_R)
+    return _scalar(lambda: key.encrypt_int(0x12345678)), lambda: mod.ToyKey(0xA1B2C3D4, TOY_R)
+
+@target("toy-batch", f"toy/toy_batch.py NumPy engine, n blocks per call, R={TOY_R}",
+        lambda: load("", "toy.toy_batch"))
+def _toy_batch(mod):
+    blocks = {}
+
+    def run(n: int):
+        if n not in blocks:
+            blocks[n] = mod.np.arange(n, dtype=mod.np.uint32)
+        mod.encrypt_toy_batch(blocks[n], 0xA1B2C3D4, TOY_R)
+    return run, None
+
+@target("brownie", "Brownie_server wrappers.saturnin_encrypt_block (hex in/out)",
+        lambda: load("Brownie_server", "wrappers"))
+def _brownie(mod):
+    return _scalar(lambda: mod.saturnin_encrypt_block("01234567", mod.BASE_KEY_HEX)), None
+
+@target("twinkle", "Brownie_server Twinkle PRF round_encryption",
+        lambda: load("Brownie_server", "twinkle_implementation.twinkle_prf"))
+def _twinkle(mod):
+    K, IV = 0x8D73B4E10F2C9A55, 0x5E4A09C3D71BF28A
+    return _scalar(lambda: mod.round_encryption(K, IV)), lambda: mod.whitening_key(K)
+
+# ------------------- Measurement (child side) -------------------
+
+def best_time(fn, repeat: int) -> float:
+    """Best seconds per call of fn(), each sample lasting at least ~0.2 s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+def measure_target(name: str, sizes, repeat: int, import_only: bool = False) -> dict:
+    description, imports, prepare = TARGETS[name]
+    t0 = time.perf_counter()
+    mod = imports()
+    result = {"import_s": time.perf_counter() - t0}
+    if import_only:
+        return result
+    try:
+        run, key_setup = prepare(mod)
+    except Skip as e:
+        return {"skipped": str(e)}
+    if key_setup is not None:
+        result["key_setup_us"] = best_time(key_setup, repeat) * 1e6
+    result["sizes"] = {}
+    for n in sizes:
+        t = best_time(lambda: run(n), repeat)
+        result["sizes"][str(n)] = {"us_per_call": t * 1e6, "blocks_per_s": n / t}
+    return result
+
+# ------------------- Driver (parent side) -------------------
+
+def run_child(name: str, sizes, repeat: int, import_only: bool) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", name,
+           "--sizes", ",".join(map(str, sizes)), "--repeat", str(repeat)]
+    if import_only:
+        cmd.append("--import-only")
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"skipped": "failed: " + (proc.stderr.strip().splitlines() or ["?"])[-1]}
+    # the last line is ours; targets may print above it
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def run_benchmarks(names, sizes, repeat: int = DEFAULT_REPEAT, progress: bool = True) -> dict:
+    results = {}
+    for name in names:
+        if progress:
+            sys.stderr.write(f"{name} ...\n")
+        res = run_child(name, sizes, repeat, import_only=False)
+        if "skipped" not in res:
+            # more cold imports for a stable import time
+            imports = [res["import_s"]] + [run_child(name, sizes, repeat, True).get("import_s", float("inf"))
+                                           for _ in range(repeat - 1)]
+            res["import_s"] = min(imports)
+        res["description"] = TARGETS[name][0]
+        results[name] = res
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def print_results(report: dict):
+    for name, res in report["results"].items():
+        print(f"\n{name}: {res['description']}")
+        if "skipped" in res:
+            print(f"  skipped ({res['skipped']})")
+            continue
+        line = f"  import {res['import_s'] * 1e3:8.1f} ms"
+        if "key_setup_us" in res:
+            line += f"   key setup {res['key_setup_us']:10.1f} us"
+        print(line)
+        for n, m in res["sizes"].items():
+            print(f"  n={n:>6}  {m['us_per_call']:14.1f} us/call  {m['blocks_per_s']:14.0f} blocks/s")
+
+# ------------------- Regression check -------------------
+
+def metrics(report: dict) -> dict:
+    """Flatten to {metric: (value, higher_is_better)}."""
+    out = {}
+    for name, res in report["results"].items():
+        if "skipped" in res:
+            continue
+        out[f"{name}.import_s"] = (res["import_s"], False)
+        if "key_setup_us" in res:
+            out[f"{name}.key_setup_us"] = (res["key_setup_us"], False)
+        for n, m in res["sizes"].items():
+            out[f"{name}.n={n}.blocks_per_s"] = (m["blocks_per_s"], True)
+    return out
+
+def compare(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Print a comparison table and return the names of regressed metrics."""
+    new, old = metrics(report), metrics(baseline)
+    regressions = []
+    print(f"\n{'metric':40s} {'baseline':>14s} {'current':>14s} {'change':>9s}")
+    for key in sorted(new.keys() & old.keys()):
+        (value, higher), (base, _) = new[key], old[key]
+        if base == 0:
+            continue
+        change = value / base - 1.0
+        worse = -change if higher else change
+        flag = ""
+        if worse > threshold:
+            flag = "REGRESSION"
+            regressions.append(key)
+        elif worse < -threshold:
+            flag = "improved"
+        print(f"{key:40s} {base:14.4g} {value:14.4g} {change * 100:+8.1f}% {flag}")
+    for key in sorted(old.keys() - new.keys()):
+        print(f"{key:40s} {'(not measured)':>30s}")
+    return regressions
+
+# ------------------- Main -------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cipher benchmark suite")
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        help="comma-separated subset of " + ",".join(TARGETS))
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="batch sizes in blocks (default %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per measurement")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--import-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    if args.child:
+        print(json.dumps(measure_target(args.child, sizes, args.repeat, args.import_only)))
+        return 0
+
+    names = args.targets.split(",")
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        parser.error("unknown targets: " + ", ".join(unknown))
+
+    report = run_benchmarks(names, sizes, args.repeat)
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,18 @@
 import sys
 import os
 import random
+import argparse
+import heapq
+import time
+
+import numpy as np
 
 # Add parent directory to path to import toy
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from toy import toy
+from toy import toy, toy_table
+import dlct
+from dl_batch import estimate_bias
 
 def get_random_state():
     return [random.randint(0, 15) for _ in range(8)]
@@ -115,7 +122,115 @@ def search_linear_append():
             
     return best_mask, best_bias
 
+# ---------------------------------------------------------
+# Search: exact 3-round constructions
+#   E0  round 0  differential  Δin -> Δm        probability p
+#   Em  round 1  DL            Δm  -> Γm        correlation r
+#   E1  round 2  linear        Γm  -> Γout      correlation q
+# scored by p * |r| * q^2. Every layer is exact: a round acts on the 4
+# columns through the plane function S.mds.S and then mixes them with
+# L_odd, so the best Δin for a given Δm (over all 2^32 differences) and
+# the best Γout for a given Γm are picked column by column from the
+# plane DDT and LAT.
+# ---------------------------------------------------------
+def middle_values(kind):
+    """Packed Δm / Γm candidates: single nibbles (120) or single columns (1020)."""
+    if kind == "nibble":
+        return [v << (28 - 4*i) for i in range(8) for v in range(1, 16)]
+    return [toy_table.from_columns(c << (8*k)) for k in range(4) for c in range(1, 256)]
+
+def column_array(values):
+    return np.array([dlct.toy_columns(v) for v in values])
+
+def best_differentials(deltas, r=0):
+    """For every Δm, (p, Δin) of the best differential Δin -> Δm over round r."""
+    D = dlct.toy_plane_ddt()
+    best, arg = D.max(axis=0), D.argmax(axis=0)
+    layer = dlct.toy_odd_layer(r)
+    u = column_array([layer.difference_inv(d) for d in deltas])
+    p = np.prod(best[u] / 256, axis=1)
+    d_in = [toy_table.from_columns(sum(int(arg[c]) << (8*k) for k, c in enumerate(row))) for row in u]
+    return p, d_in
+
+def best_linear(masks, r=2):
+    """For every Γm, (|q|, Γout) of the best approximation Γm -> Γout over round r."""
+    L = np.abs(dlct.toy_plane_lat())
+    best, arg = L.max(axis=1), L.argmax(axis=1)
+    layer = dlct.toy_odd_layer(r)
+    a = column_array(masks)
+    q = np.prod(best[a] / 256, axis=1)
+    g_out = [layer.propagate_mask(toy_table.from_columns(sum(int(arg[c]) << (8*k) for k, c in enumerate(row))))
+             for row in a]
+    return q, g_out
+
+def search_constructions(top=10, middle="nibble", start=0):
+    """
+    The 'top' best 3-round constructions over rounds start..start+2,
+    one (the best trail) per distinct (Δin, Γout). Returns a list of
+    (score, Δin, Δm, Γm, Γout, p, r, q), best first.
+    """
+    values = middle_values(middle)
+    p, d_in = best_differentials(values, start)
+    q, g_out = best_linear(values, start + 2)
+    C, trivial = dlct.toy_correlations(values, values, start + 1)
+    # a trivial middle (mask blind to the difference) says nothing about the pair
+    S = np.where(trivial, 0.0, p[:, None] * np.abs(C) * (q ** 2)[None, :])
+
+    # collapse the Γm sharing a Γout to the best one per Δm, so the top few
+    # of a row are distinct Γout; then one entry per (Δin, Γout) and a
+    # bounded heap
+    groups = {}
+    for j, g in enumerate(g_out):
+        groups.setdefault(g, []).append(j)
+    cols = np.empty((len(values), len(groups)), dtype=np.int64)
+    for c, js in enumerate(groups.values()):
+        js = np.array(js)
+        cols[:, c] = js[S[:, js].argmax(axis=1)]
+    G = np.take_along_axis(S, cols, axis=1)
+
+    best = {}
+    k = min(top, G.shape[1])
+    for i in range(len(values)):
+        for j in cols[i, np.argpartition(-G[i], k - 1)[:k]]:
+            score = float(S[i, j])
+            key = (d_in[i], g_out[j])
+            if score > 0 and score > best.get(key, (0.0,))[0]:
+                best[key] = (score, d_in[i], values[i], values[j], g_out[j],
+                             float(p[i]), float(C[i, j]), float(q[j]))
+    return heapq.nlargest(top, best.values())
+
+def nibbles(v):
+    return toy_table.int_to_nibbles(v)
+
+def run_search(top=10, middle="nibble", verify_bits=0):
+    t0 = time.perf_counter()
+    results = search_constructions(top, middle)
+    print(f"Top {len(results)} 3-round constructions ({middle} middle), "
+          f"{time.perf_counter() - t0:.2f}s")
+    key = random.getrandbits(32)
+    for score, d_in, d_m, g_m, g_out, p, r, q in results:
+        print(f"\n  Δin {nibbles(d_in)} -> Γout {nibbles(g_out)}: estimate {score:.3e}")
+        print(f"    E0 p = {p:.4f} -> Δm {nibbles(d_m)}, Em r = {r:+.4f} -> Γm {nibbles(g_m)}, "
+              f"E1 |q| = {q:.4f}")
+        if verify_bits:
+            bias, _ = estimate_bias(d_in, g_out, key, 3, 1 << verify_bits)
+            print(f"    sampled bias over 2^{verify_bits} pairs: {bias:+.3e} "
+                  f"(noise ~{2 ** (-verify_bits / 2):.1e})")
+    return results
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="3-round DL construction for the toy cipher")
+    parser.add_argument("mode", nargs="?", choices=["sample", "search"], default="sample")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--middle", choices=["nibble", "column"], default="nibble",
+                        help="shape of Δm and Γm in the search")
+    parser.add_argument("--verify", type=int, default=0, metavar="BITS",
+                        help="sample each result with 2^BITS pairs")
+    args = parser.parse_args()
+    if args.mode == "search":
+        run_search(args.top, args.middle, args.verify)
+        sys.exit()
+
     d, p = search_differential_prepend()
     m, b = search_linear_append()
     
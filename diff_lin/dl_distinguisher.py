@@ -1,46 +1,19 @@
 import sys
 import os
-import random
+import math
 import numpy as np
 
 # Add parent directory to path to import toy
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from toy import toy
-
-def get_random_state():
-    return [random.randint(0, 15) for _ in range(8)]
-
-def apply_diff(state, diff):
-    return [s ^ d for s, d in zip(state, diff)]
-
-def apply_mask(state, mask):
-    res = 0
-    for s, m in zip(state, mask):
-        val = s & m
-        # Parity of val
-        while val:
-            res ^= (val & 1)
-            val >>= 1
-    return res
-
-def run_one_trial(diff_in, mask_out, trials=5000):
-    """Estimate bias for a given diff/mask pair."""
-    key = [random.randint(0, 15) for _ in range(8)]
-    count_equal = 0
-
-    for _ in range(trials):
-        p1 = get_random_state()
-        p2 = apply_diff(p1, diff_in)
-        c1 = toy.encrypt_toy_debug(p1, key, R=1)
-        c2 = toy.encrypt_toy_debug(p2, key, R=1)
-        m1 = apply_mask(c1, mask_out)
-        m2 = apply_mask(c2, mask_out)
-        if m1 == m2:
-            count_equal += 1
-
-    prob = count_equal / trials
-    bias = 2 * (prob - 0.5)
-    return bias, prob
+from dl_batch import count_equal, estimate_bias
+
+def random_key(rng):
+    return [int(k) for k in rng.integers(0, 16, size=8)]
+
+def run_one_trial(diff_in, mask_out, trials=5000, R=1, rng=None):
+    """Estimate bias for a given diff/mask pair (random key and pairs drawn from rng)."""
+    rng = rng or np.random.default_rng()
+    return estimate_bias(diff_in, mask_out, random_key(rng), R, trials, rng)
 
 def estimate_data_complexity(bias):
     """Estimate number of pairs needed to detect given bias."""
@@ -48,9 +21,10 @@ def estimate_data_complexity(bias):
         return float('inf')
     return round(1 / (bias ** 2))
 
-def run_generic_distinguisher(num_tests=10, trials=5000):
+def run_generic_distinguisher(num_tests=10, trials=5000, seed=None):
     """Try random Δin and mask_out pairs and estimate their biases."""
     print(f"Testing {num_tests} random trails with {trials} samples each...")
+    rng = np.random.default_rng(seed)
     results = []
 
     for _ in range(num_tests):
@@ -58,11 +32,11 @@ def run_generic_distinguisher(num_tests=10, trials=5000):
         mask_out = [0]*8
 
         # Random non-zero input diff and mask on same nibble (for simplicity)
-        pos = random.randint(0, 7)
-        diff_in[pos] = random.randint(1, 15)
-        mask_out[pos] = random.randint(1, 15)
+        pos = int(rng.integers(0, 8))
+        diff_in[pos] = int(rng.integers(1, 16))
+        mask_out[pos] = int(rng.integers(1, 16))
 
-        bias, prob = run_one_trial(diff_in, mask_out, trials=trials)
+        bias, prob = run_one_trial(diff_in, mask_out, trials=trials, rng=rng)
         N = estimate_data_complexity(bias)
         results.append((diff_in, mask_out, bias, prob, N))
 
@@ -76,5 +50,88 @@ def run_generic_distinguisher(num_tests=10, trials=5000):
         print(f"Δ={r[0]}, Γ={r[1]}, bias={r[2]:.4f}, data≈{r[4]}")
     return results
 
+def same_nibble_candidates(num_tests=None, rng=None):
+    """(Δin, mask_out) pairs on one nibble: all 8*15*15 of them, or num_tests random ones."""
+    all_pairs = [(pos, d, m) for pos in range(8) for d in range(1, 16) for m in range(1, 16)]
+    if num_tests is not None:
+        rng = rng or np.random.default_rng()
+        picked = rng.choice(len(all_pairs), min(num_tests, len(all_pairs)), replace=False)
+        all_pairs = [all_pairs[i] for i in picked]
+    candidates = []
+    for pos, d, m in all_pairs:
+        diff_in, mask_out = [0]*8, [0]*8
+        diff_in[pos], mask_out[pos] = d, m
+        candidates.append((diff_in, mask_out))
+    return candidates
+
+def confidence_radius(n, delta):
+    """Hoeffding radius of a correlation estimated from n pairs, at error probability delta."""
+    return math.sqrt(2 * math.log(2 / delta) / n)
+
+def run_adaptive_distinguisher(candidates=None, R=1, budget=1 << 22, top=10, min_bias=0.01,
+                               precision=0.1, delta=1e-3, first_batch=256, seed=None):
+    """
+    Sequential bias estimation over many (Δin, mask_out) candidates.
+
+    Every candidate still in the race gets a batch of pairs per step, the
+    batch doubling each step. After a step the confidence interval
+    bias ± r (Hoeffding, with delta split over candidates and steps so the
+    intervals hold for all of them at once) decides:
+      * |bias| + r below min_bias, or below the top-th best lower bound
+        |bias| - r of all candidates  -> dropped, cannot make the top
+      * r <= precision * |bias|       -> done, bias known to that precision
+    Sampling stops when no candidate is left or the total of 'budget'
+    pairs is spent; candidates still racing keep their current estimate.
+    Candidate i draws its key and pairs from SeedSequence(seed).spawn()[i],
+    so a given seed reproduces the race.
+    """
+    candidates = candidates or same_nibble_candidates()
+    K = len(candidates)
+    print(f"Racing {K} candidates for the top {top}, budget {budget} pairs, "
+          f"precision {precision:.0%}...")
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(K)]
+    state = [{"diff": d, "mask": m, "key": random_key(rng), "rng": rng, "n": 0, "equal": 0,
+              "low": 0.0, "high": 1.0, "status": "racing"}
+             for (d, m), rng in zip(candidates, rngs)]
+
+    used, step, batch = 0, 1, first_batch
+    racing = state
+    while racing:
+        n = min(batch, (budget - used) // len(racing))
+        if n <= 0:
+            break
+        delta_step = delta / (K * step * (step + 1))
+        for c in racing:
+            c["equal"] += count_equal(c["diff"], c["mask"], c["key"], R, n, c["rng"])
+            c["n"] += n
+            bias = 2 * c["equal"] / c["n"] - 1
+            r = confidence_radius(c["n"], delta_step)
+            c["low"], c["high"] = max(abs(bias) - r, 0.0), min(abs(bias) + r, 1.0)
+            if r <= precision * abs(bias):
+                c["status"] = "done"
+        used += n * len(racing)
+
+        lows = sorted((c["low"] for c in state), reverse=True)
+        cut = max(min_bias, lows[min(top, K) - 1])
+        for c in racing:
+            if c["status"] == "racing" and c["high"] < cut:
+                c["status"] = "dropped"
+        racing = [c for c in racing if c["status"] == "racing"]
+        step, batch = step + 1, batch * 2
+
+    results = []
+    for c in state:
+        bias = 2 * c["equal"] / c["n"] - 1 if c["n"] else 0.0
+        results.append((c["diff"], c["mask"], bias, c["n"], c["status"]))
+    results.sort(key=lambda x: abs(x[2]), reverse=True)
+    counts = {s: sum(r[4] == s for r in results) for s in ("done", "dropped", "racing")}
+    print(f"Used {used} pairs: {counts['done']} resolved, {counts['dropped']} dropped, "
+          f"{counts['racing']} unresolved")
+    print("\nTop Biases Found:")
+    for r in results[:top]:
+        print(f"Δ={r[0]}, Γ={r[1]}, bias={r[2]:.4f} ({r[3]} pairs, {r[4]}), "
+              f"data≈{estimate_data_complexity(r[2])}")
+    return results
+
 if __name__ == "__main__":
-    results = run_generic_distinguisher(num_tests=20, trials=5000)
+    results = run_adaptive_distinguisher()
@@ -0,0 +1,211 @@
+"""
+Parallel, reproducible runs of a differential-linear distinguisher.
+
+A run is fixed by (diff, masks, rounds, key, seed). Its trials are cut
+into work units of --unit pairs; unit i draws its plaintexts from its own
+stream, SeedSequence(seed, spawn_key=(i,)), so the counts of a unit do
+not depend on which process computes it, in which order, or how many
+units the run has. Workers return one small record per unit,
+(index, pairs, agreements per mask), and records merge by addition.
+
+Records are checkpointed to a JSON file (atomically, every
+--checkpoint-every seconds and at the end). Running the same command
+again skips the units already done: an interrupted run resumes, a run
+with a larger --trials extends the old one, and a smaller --trials reuses
+its first units. For a given seed and trial count the totals are
+bit-identical however the run was split up.
+
+The key is given with --key, or derived from the seed when omitted;
+--key random draws a fresh key for every pair (the bias averaged over
+keys).
+
+Usage:
+    python3 dl_runner.py --diff 21331310 --mask 00800000 --rounds 3 --trials 1073741824 --seed 1
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Add parent directory to path to import toy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dl_batch import CHUNK_PAIRS, count_equal_masks
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+DEFAULT_UNIT = CHUNK_PAIRS
+RANDOM_KEY = "random"
+
+# ------------------- Job -------------------
+
+def derive_key(seed: int) -> int:
+    """32-bit key of a run whose key is not given (the seed's root stream)."""
+    return int(np.random.default_rng(np.random.SeedSequence(seed)).integers(0, 1 << 32))
+
+def make_job(diff: int, masks: Sequence[int], R: int, seed: int, key: Union[int, str, None] = None,
+             unit: int = DEFAULT_UNIT) -> Dict:
+    """key: an int, RANDOM_KEY for a fresh key per pair, or None for one derived from the seed."""
+    if key is None:
+        key = derive_key(seed)
+    return {"diff": f"{diff:08x}", "masks": [f"{m:08x}" for m in masks], "R": R, "seed": seed,
+            "key": key if key == RANDOM_KEY else f"{key:08x}", "unit": unit}
+
+def checkpoint_path(job: Dict, directory: str = DEFAULT_DIR) -> str:
+    masks = "-".join(job["masks"])
+    return os.path.join(directory, f"dl_R{job['R']}_D{job['diff']}_M{masks}_K{job['key']}"
+                                   f"_S{job['seed']}_U{job['unit']}.json")
+
+def read_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_checkpoint(path: str, state: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+def merge(records: Sequence[Sequence[int]], n_masks: int) -> Dict:
+    """Totals of unit records [pairs, agreements...]."""
+    pairs = sum(r[0] for r in records)
+    equal = [sum(r[1 + j] for r in records) for j in range(n_masks)]
+    return {"pairs": pairs, "equal": equal}
+
+# ------------------- Worker -------------------
+
+# per-process job set up by _init_worker
+_job = {}
+
+def _init_worker(job: Dict):
+    _job.update(job)
+
+def _run_unit(work):
+    """Counts of unit 'index' over its first 'size' pairs; returns (index, [size, agreements...])."""
+    index, size = work
+    rng = np.random.default_rng(np.random.SeedSequence(_job["seed"], spawn_key=(index,)))
+    diff, masks = int(_job["diff"], 16), [int(m, 16) for m in _job["masks"]]
+    if _job["key"] != RANDOM_KEY:
+        equal = count_equal_masks(diff, masks, int(_job["key"], 16), _job["R"], size, rng)
+        return index, [size] + equal
+    # a fresh key for every pair, drawn from the unit's stream chunk by chunk
+    # (keys, then plaintexts) to keep the memory bounded
+    equal = [0] * len(masks)
+    for start in range(0, size, CHUNK_PAIRS):
+        n = min(CHUNK_PAIRS, size - start)
+        key = rng.integers(0, 1 << 32, size=n, dtype=np.uint32)
+        for j, e in enumerate(count_equal_masks(diff, masks, key, _job["R"], n, rng)):
+            equal[j] += e
+    return index, [size] + equal
+
+def run_units(job: Dict, work: Sequence, workers: int = None) -> Iterator:
+    """(index, record) for every (index, size) in 'work', in completion order."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(work) <= 1:
+        _init_worker(job)
+        try:
+            yield from map(_run_unit, work)
+        finally:
+            _job.clear()
+        return
+    pool = Pool(min(workers, len(work)), initializer=_init_worker, initargs=(job,))
+    try:
+        yield from pool.imap_unordered(_run_unit, work)
+    except BaseException:
+        # interrupted (Ctrl-C, error, generator closed): drop the queued units
+        pool.terminate()
+        pool.join()
+        raise
+    pool.close()
+    pool.join()
+
+def unit_sizes(unit: int, trials: int) -> List[int]:
+    """Pairs of every unit of a run of 'trials' pairs."""
+    return [min(unit, trials - i * unit) for i in range(math.ceil(trials / unit))]
+
+# ------------------- Driver -------------------
+
+def run(job: Dict, trials: int, path: str = None, workers: int = None,
+        checkpoint_every: float = 30.0, progress: bool = True) -> Dict:
+    """
+    Bring the run up to 'trials' pairs, reusing the units in its checkpoint.
+    Returns the merged totals.
+    """
+    path = path or checkpoint_path(job)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    state = read_checkpoint(path)
+    if state is None:
+        state = {"job": job, "units": {}}
+    elif state["job"] != job:
+        raise ValueError(f"{path} belongs to a different run: {state['job']}")
+
+    unit = job["unit"]
+    units = state["units"]
+    sizes = unit_sizes(unit, trials)
+    n_units = len(sizes)
+    # a unit stored at another size (the last unit of a shorter or longer
+    # run) is redone at its size here; a larger stored record is kept
+    work = [(i, size) for i, size in enumerate(sizes) if units.get(str(i), [0])[0] != size]
+    fresh = {}
+
+    t0 = last = time.perf_counter()
+    try:
+        for n, (index, record) in enumerate(run_units(job, work, workers), 1):
+            fresh[index] = record
+            if record[0] > units.get(str(index), [0])[0]:
+                units[str(index)] = record
+            now = time.perf_counter()
+            if now - last >= checkpoint_every:
+                _write_checkpoint(path, state)
+                last = now
+            if progress:
+                rate = n * unit / max(now - t0, 1e-9)
+                sys.stderr.write(f"\r{n}/{len(work)} units  {rate / 1e6:8.2f} M pairs/s")
+                sys.stderr.flush()
+    finally:
+        _write_checkpoint(path, state)
+        if progress and work:
+            sys.stderr.write("\n")
+    return merge([fresh.get(i) or units[str(i)] for i in range(n_units)], len(job["masks"]))
+
+def report(job: Dict, totals: Dict, out=sys.stdout):
+    n = totals["pairs"]
+    out.write(f"R = {job['R']}, key {job['key']}, diff {job['diff']}, seed {job['seed']}: {n} pairs\n")
+    for mask, equal in zip(job["masks"], totals["equal"]):
+        bias = 2 * equal / n - 1
+        out.write(f"  mask {mask}: {equal} agree, bias {bias:+.6f} "
+                  f"(z = {bias * math.sqrt(n):+.2f})\n")
+
+# ------------------- Main -------------------
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Parallel, resumable DL distinguisher runs")
+    parser.add_argument("--diff", required=True, help="input difference, 8 hex nibbles")
+    parser.add_argument("--mask", required=True, nargs="+", help="output mask(s), 8 hex nibbles")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--trials", type=int, default=1 << 24, help="total pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--key", default=None,
+                        help="8 hex characters or 'random' for a key per pair (default: derived from the seed)")
+    parser.add_argument("--unit", type=int, default=DEFAULT_UNIT, help="pairs per work unit")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default under runs/)")
+    parser.add_argument("--checkpoint-every", type=float, default=30.0, help="seconds between checkpoints")
+    args = parser.parse_args(argv)
+
+    key = args.key if args.key in (None, RANDOM_KEY) else int(args.key, 16)
+    job = make_job(int(args.diff, 16), [int(m, 16) for m in args.mask], args.rounds, args.seed,
+                   key, args.unit)
+    totals = run(job, args.trials, args.checkpoint, args.workers, args.checkpoint_every)
+    report(job, totals)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Last-round key recovery for R-round toy Saturnin.
+
+The attack puts a distinguisher on the first rounds and peels the last
+one or two rounds by partial decryption. In the column layout of
+toy_table.py (byte k = bit k of every nibble) a round splits by columns:
+
+    c  --L^-1(. ^ rc)-->  c'   (whole state, no key involved)
+    c' ^ k'              with the equivalent key k' = L^-1(k_r)
+    --S^-1--> --mds^-1--> --S^-1-->  column k of the state one round earlier
+
+The S-box and mds both act column by column, so peeling the last round
+turns column k of c' and the 8 bits of k' in that column into column k
+of the state after R-1 rounds: 256 guesses per column. One more round
+back, L^-1 of the second-to-last round mixes pairs of columns, so a
+column there costs two last-round columns and one more key column
+(2^24 guesses, pruned set by set).
+
+Ciphertexts are reduced to counters once. For pairs (differential-linear),
+N[a, b] counts pairs with column values (a, b). For integral sets, the
+counter is the parity of each column value. The guesses then work on
+those counters through a 256 x 256 table PEEL_GUESS[g, a], the partial
+decryption of column value a under guess g. This table is shared by every
+guess, pair and set.
+
+Default attacks:
+  R = 3, dl:        2-round differential-linear (correlation about -0.043),
+                    last round peeled, 2^15 pairs per difference;
+  R = 3, integral:  2-round integral ACCCCCCC (every output bit balanced),
+                    last round peeled;
+  R = 4, integral:  the same 2-round integral, last two rounds peeled.
+The 3-round differential-linear constructions of construct_3round.py
+(bias about 2^-9) would need some 2^20 pairs per column guess, so the
+4-round attack peels two rounds of the 2-round integral instead, with
+82 chosen plaintexts.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from itertools import product
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+# Add parent directory to path to import toy and zerosum
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from toy import toy, toy_table, toy_batch, toy_codebook
+from zerosum.integral import structured_set, parse_pattern
+
+# ------------------- Round tables -------------------
+
+TO_COL, FROM_COL = toy_codebook.TO_COL, toy_codebook.FROM_COL
+apply = toy_codebook.apply
+
+# odd linear layer of round r, by r & 1 (0: SR_slice, 1: SR_sheet), and its inverse
+L_FWD = {
+    0: np.array(toy_table.column_tables(lambda s: toy.inv_SR_slice(toy.mds(toy.SR_slice(s)))), dtype=np.uint32),
+    1: np.array(toy_table.column_tables(lambda s: toy.inv_SR_sheet(toy.mds(toy.SR_sheet(s)))), dtype=np.uint32),
+}
+L_INV = {0: toy_codebook.L_INV_SLICE, 1: toy_codebook.L_INV_SHEET}
+
+# S^-1, mds^-1, S^-1 on one column byte
+PEEL = np.array([toy_table.T_SBOX_INV[0][toy_table.T_INV_EVEN[0][c]] for c in range(256)], dtype=np.uint8)
+_V = np.arange(256)
+PEEL_GUESS = PEEL[_V[:, None] ^ _V[None, :]]
+PARITY = np.array([bin(v).count("1") & 1 for v in range(256)], dtype=np.uint8)
+
+def round_constants_col(R: int, r: int) -> int:
+    """Round constants of round r, as a column-layout int."""
+    rc0, rc1 = toy.make_round_constants(R)
+    state = [0] * 8
+    state[0] ^= rc0[r]
+    state[4] ^= rc1[r]
+    return toy_table.to_columns(toy_table.nibbles_to_int(state))
+
+def strip_last_layer(C: np.ndarray, R: int) -> np.ndarray:
+    """c' = L^-1(c ^ rc) of the last round in column layout, for packed ciphertexts C."""
+    return apply(L_INV[(R - 1) & 1], apply(TO_COL, C) ^ np.uint32(round_constants_col(R, R - 1)))
+
+def column(x: np.ndarray, k: int) -> np.ndarray:
+    return ((x >> np.uint32(8 * k)) & np.uint32(0xFF)).astype(np.int64)
+
+def column_inputs(r: int, j: int) -> List[int]:
+    """Columns of the input that column j of L^-1 of round r depends on."""
+    T = L_INV[r & 1]
+    return [k for k in range(4) if ((T[k] >> np.uint32(8 * j)) & np.uint32(0xFF)).any()]
+
+def rol1_nibbles(v: np.ndarray) -> np.ndarray:
+    return ((v << np.uint32(1)) & np.uint32(0xEEEEEEEE)) | ((v >> np.uint32(3)) & np.uint32(0x11111111))
+
+def equivalent_key(key: int, r: int) -> int:
+    """k' = L^-1(k_r) in column layout: the key of round r, for a packed master key."""
+    nibbles = toy_table.int_to_nibbles(key)
+    k_r = [toy.rol4(k, 3) for k in nibbles] if (r & 1) == 0 else nibbles
+    col = np.array([toy_table.to_columns(toy_table.nibbles_to_int(k_r))], dtype=np.uint32)
+    return int(apply(L_INV[r & 1], col)[0])
+
+def master_keys(k_eq: np.ndarray, r: int) -> np.ndarray:
+    """Inverse of equivalent_key for a uint32 array of column-layout k' of round r."""
+    k_r = apply(FROM_COL, apply(L_FWD[r & 1], k_eq))
+    # even rounds use the key rotated left by 3
+    return rol1_nibbles(k_r) if (r & 1) == 0 else k_r
+
+# ------------------- Oracle -------------------
+
+class Oracle:
+    """Encryption under a secret key; counts the plaintexts it is asked for."""
+
+    def __init__(self, key: int, R: int):
+        self.key, self.R = key, R
+        self.queries = 0
+
+    def encrypt(self, P: np.ndarray) -> np.ndarray:
+        self.queries += len(P)
+        return toy_batch.encrypt_toy_batch(P, self.key, self.R)
+
+# ------------------- Distinguishers -------------------
+
+# Differential-linear on R-1 rounds: plaintext difference 'delta' (packed),
+# after R-1 rounds mask 'mask' on column 'column' has correlation 'bias'.
+DL = namedtuple("DL", "delta column mask bias")
+
+# Integral: over a set with pattern 'pattern' (A/C letters), the bits
+# 'mask' of column 'column' XOR to zero after the distinguisher rounds.
+Integral = namedtuple("Integral", "pattern column mask")
+
+def dl_counters(oracle: Oracle, delta: int, n_pairs: int, columns: Sequence[int],
+                rng: np.random.Generator, chunk: int = 1 << 20) -> Dict[int, np.ndarray]:
+    """N[k][a, b]: pairs whose stripped ciphertexts have column k values (a, b)."""
+    counts = {k: np.zeros(1 << 16, dtype=np.int64) for k in columns}
+    for start in range(0, n_pairs, chunk):
+        n = min(chunk, n_pairs - start)
+        P = rng.integers(0, 1 << 32, size=n, dtype=np.uint32)
+        c1 = strip_last_layer(oracle.encrypt(P), oracle.R)
+        c2 = strip_last_layer(oracle.encrypt(P ^ np.uint32(delta)), oracle.R)
+        for k in columns:
+            counts[k] += np.bincount(column(c1, k) * 256 + column(c2, k), minlength=1 << 16)
+    return {k: c.reshape(256, 256) for k, c in counts.items()}
+
+def dl_scores(N: np.ndarray, mask: int, bias: float) -> np.ndarray:
+    """
+    Correlation of the masked column over the pairs, for every guess,
+    scaled to a z-score in the direction of the expected bias.
+    """
+    F = 1.0 - 2.0 * PARITY[PEEL_GUESS & mask]
+    total = N.sum()
+    corr = ((F @ N) * F).sum(axis=1) / total
+    return np.sign(bias) * corr * np.sqrt(total)
+
+def integral_sets(oracle: Oracle, pattern: str, n_sets: int, rng: np.random.Generator,
+                  chunk: int = 1 << 22) -> Iterable[np.ndarray]:
+    """Stripped ciphertexts of n_sets structured sets, one chunk at a time per set."""
+    active = parse_pattern(pattern)
+    size = 1 << (4 * len(active))
+    active_mask = np.uint32(sum(0xF << (28 - 4*i) for i in active))
+    for _ in range(n_sets):
+        base = np.uint32(rng.integers(0, 1 << 32)) & ~active_mask
+        yield [strip_last_layer(oracle.encrypt(base ^ structured_set(active, start, min(chunk, size - start))),
+                                oracle.R)
+               for start in range(0, size, chunk)]
+
+def integral_parities(oracle: Oracle, pattern: str, n_sets: int, columns: Sequence[int],
+                      rng: np.random.Generator) -> Dict[int, List[np.ndarray]]:
+    """For every set and column k, the parity of how often each column value occurs."""
+    parities = {k: [] for k in columns}
+    for chunks in integral_sets(oracle, pattern, n_sets, rng):
+        for k in columns:
+            counts = sum(np.bincount(column(c, k), minlength=256) for c in chunks)
+            parities[k].append((counts & 1).astype(bool))
+    return parities
+
+def integral_scores(parities: List[np.ndarray], mask: int) -> np.ndarray:
+    """Minus the number of sets whose masked partial-decryption XOR is non-zero, per guess."""
+    score = np.zeros(256)
+    for odd in parities:
+        sums = np.bitwise_xor.reduce(PEEL_GUESS[:, odd], axis=1) if odd.any() else np.zeros(256, np.uint8)
+        score -= (sums & mask) != 0
+    return score
+
+# ------------------- One round peeled -------------------
+
+def rank_columns(oracle: Oracle, distinguishers, n_pairs: int, n_sets: int,
+                 rng: np.random.Generator) -> Dict[int, np.ndarray]:
+    """Summed scores of the 256 guesses of every last-round column the distinguishers cover."""
+    scores = {}
+    by_data = {}
+    for d in distinguishers:
+        by_data.setdefault((type(d).__name__, d[0]), []).append(d)
+    for (kind, data), group in by_data.items():
+        columns = sorted({d.column for d in group})
+        if kind == "DL":
+            N = dl_counters(oracle, data, n_pairs, columns, rng)
+            for d in group:
+                scores[d.column] = scores.get(d.column, 0) + dl_scores(N[d.column], d.mask, d.bias)
+        else:
+            parities = integral_parities(oracle, data, n_sets, columns, rng)
+            for d in group:
+                scores[d.column] = scores.get(d.column, 0) + integral_scores(parities[d.column], d.mask)
+    return scores
+
+def column_candidates(scores: Dict[int, np.ndarray], tries: int) -> Iterable[np.ndarray]:
+    """
+    Last-round k' candidates: combinations of the best column guesses,
+    best rank sum first, each with every value of the columns no
+    distinguisher covers.
+    """
+    columns = sorted(scores)
+    free = [k for k in range(4) if k not in scores]
+    order = {k: np.argsort(-scores[k], kind="stable") for k in columns}
+    depth = 1
+    while depth ** len(columns) < tries and depth < 256:
+        depth += 1
+    combos = sorted(product(range(depth), repeat=len(columns)), key=sum)[:tries]
+
+    free_values = np.arange(1 << (8 * len(free)), dtype=np.uint32)
+    spread = np.zeros_like(free_values)
+    for j, k in enumerate(free):
+        spread |= ((free_values >> np.uint32(8 * j)) & np.uint32(0xFF)) << np.uint32(8 * k)
+    for combo in combos:
+        fixed = sum(int(order[k][r]) << (8 * k) for k, r in zip(columns, combo))
+        yield spread ^ np.uint32(fixed)
+
+# ------------------- Two rounds peeled -------------------
+
+def two_round_candidates(oracle: Oracle, pattern: str, mask: int, n_sets: int,
+                         rng: np.random.Generator) -> np.ndarray:
+    """
+    k' of the last round surviving an integral on R-2 rounds. Column j of
+    the state after R-2 rounds needs last-round columns a, b (the inputs of
+    column j of L^-1 of round R-2) and column j of that round's k'. Guesses
+    (g_a, g_b, g_j) are checked on the first set, the survivors on the
+    next ones. Two such columns cover all four last-round columns.
+    """
+    R = oracle.R
+    r = R - 2
+    T = L_INV[r & 1]
+    sets = [np.concatenate(chunks) for chunks in integral_sets(oracle, pattern, n_sets, rng)]
+
+    per_pair = {}
+    for j in range(4):
+        a, b = column_inputs(r, j)
+        if (a, b) in per_pair:
+            continue
+        La = ((T[a] >> np.uint32(8 * j)) & np.uint32(0xFF)).astype(np.uint8)
+        Lb = ((T[b] >> np.uint32(8 * j)) & np.uint32(0xFF)).astype(np.uint8)
+        rc = (round_constants_col(R, r) >> (8 * a), round_constants_col(R, r) >> (8 * b))
+        survivors = None
+        for c in sets:
+            # y[g_a, g_b, text] = column j of L^-1(w ^ rc), w peeled with (g_a, g_b)
+            wa = PEEL_GUESS[:, column(c, a)] ^ np.uint8(rc[0] & 0xFF)
+            wb = PEEL_GUESS[:, column(c, b)] ^ np.uint8(rc[1] & 0xFF)
+            if survivors is None:
+                y = La[wa][:, None, :] ^ Lb[wb][None, :, :]
+                found = []
+                for g in range(256):
+                    sums = np.bitwise_xor.reduce(PEEL[y ^ np.uint8(g)], axis=-1)
+                    ga, gb = np.nonzero((sums & mask) == 0)
+                    found.append(np.stack([ga, gb, np.full(len(ga), g)], axis=1))
+                survivors = np.concatenate(found)
+            else:
+                ga, gb, g = survivors.T
+                y = La[wa[ga]] ^ Lb[wb[gb]] ^ g[:, None].astype(np.uint8)
+                sums = np.bitwise_xor.reduce(PEEL[y], axis=-1)
+                survivors = survivors[(sums & mask) == 0]
+        per_pair[(a, b)] = survivors
+
+    # combine the two column pairs into full last-round keys
+    (pair0, s0), (pair1, s1) = per_pair.items()
+    k0 = np.unique((s0[:, 0] << (8 * pair0[0])) | (s0[:, 1] << (8 * pair0[1])))
+    k1 = np.unique((s1[:, 0] << (8 * pair1[0])) | (s1[:, 1] << (8 * pair1[1])))
+    return (k0[:, None] | k1[None, :]).ravel().astype(np.uint32)
+
+# ------------------- Attack -------------------
+
+# default distinguishers by (rounds, method)
+DEFAULT_DISTINGUISHERS = {
+    # 2-round differential-linear, delta in nibble 6
+    (3, "dl"): [DL(0x00000040, 0, 0x26, -0.043), DL(0x00000040, 2, 0xB5, -0.043),
+                DL(0x00000020, 1, 0xB5, -0.043), DL(0x00000020, 3, 0x26, -0.043)],
+    # 2-round integral: one active nibble balances every output bit
+    (3, "integral"): [Integral("ACCCCCCC", k, 0xFF) for k in range(4)],
+    (4, "integral"): [Integral("ACCCCCCC", None, 0xFF)],
+}
+
+def search_keys(candidates: Iterable[np.ndarray], r: int, R: int, known, chunk: int = 1 << 20):
+    """
+    First master key among the last-round k' candidates (round index r)
+    that maps the known plaintexts to their ciphertexts. Returns (key or
+    None, number of keys tested).
+    """
+    (p0, c0), (p1, c1) = known
+    tested = 0
+    for k_eq in candidates:
+        for start in range(0, len(k_eq), chunk):
+            keys = master_keys(k_eq[start:start + chunk], r)
+            tested += len(keys)
+            P = np.full(len(keys), p0, dtype=np.uint32)
+            for key in keys[toy_batch.encrypt_toy_batch(P, keys, R) == np.uint32(c0)]:
+                if toy_table.encrypt_int(p1, int(key), R) == c1:
+                    return int(key), tested
+    return None, tested
+
+def attack(key: int, R: int, method: str = "dl", distinguishers=None, n_pairs: int = 1 << 15,
+           n_sets: int = None, tries: int = 64, seed: int = None, out=sys.stdout) -> Dict:
+    """Run the full attack against a secret key; returns the recovered key and timings."""
+    rng = np.random.default_rng(seed)
+    distinguishers = distinguishers or DEFAULT_DISTINGUISHERS[(R, method)]
+    oracle = Oracle(key, R)
+
+    t0 = time.perf_counter()
+    k_eq = equivalent_key(key, R - 1)
+    ranks = {}
+    if R == 4:
+        d = distinguishers[0]
+        candidates = [two_round_candidates(oracle, d.pattern, d.mask, n_sets or 5, rng)]
+        out.write(f"{len(candidates[0])} last-round keys survive, right key among them: "
+                  f"{bool((candidates[0] == k_eq).any())}\n")
+    else:
+        scores = rank_columns(oracle, distinguishers, n_pairs, n_sets or 2, rng)
+        for k, s in sorted(scores.items()):
+            right = (k_eq >> (8 * k)) & 0xFF
+            ranks[k] = int((s > s[right]).sum())
+            out.write(f"column {k}: best guess {int(np.argmax(s)):02x}, "
+                      f"right guess {right:02x} at rank {ranks[k]}\n")
+        candidates = column_candidates(scores, tries)
+    t1 = time.perf_counter()
+
+    P = rng.integers(0, 1 << 32, size=2, dtype=np.uint32)
+    C = oracle.encrypt(P)
+    known = [(int(p), int(c)) for p, c in zip(P, C)]
+    found, tested = search_keys(candidates, R - 1, R, known)
+    t2 = time.perf_counter()
+
+    out.write(f"R = {R} ({method}): {oracle.queries} chosen plaintexts, counting and ranking "
+              f"{t1 - t0:.2f}s, key search {t2 - t1:.2f}s ({tested} keys tested)\n")
+    out.write(f"recovered key {found:08x}\n" if found is not None else "key not recovered\n")
+    return {"R": R, "method": method, "key": key, "recovered": found, "success": found == key,
+            "queries": oracle.queries, "ranks": ranks, "keys_tested": tested,
+            "time_data": t1 - t0, "time_search": t2 - t1, "time_total": t2 - t0}
+
+# ------------------- Main -------------------
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Last-round key recovery on the toy cipher")
+    parser.add_argument("--rounds", type=int, default=3, choices=[3, 4])
+    parser.add_argument("--method", choices=["dl", "integral"], default=None,
+                        help="distinguisher (default: dl for 3 rounds, integral for 4)")
+    parser.add_argument("--key", default=None, help="secret key as 8 hex characters (default random)")
+    parser.add_argument("--pairs", type=int, default=1 << 15, help="pairs per DL difference")
+    parser.add_argument("--sets", type=int, default=None, help="integral sets (default 2, or 5 for 4 rounds)")
+    parser.add_argument("--tries", type=int, default=64, help="column-guess combinations to try")
+    parser.add_argument("--trials", type=int, default=1, help="attacks on independent random keys")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    method = args.method or ("dl" if args.rounds == 3 else "integral")
+    if (args.rounds, method) not in DEFAULT_DISTINGUISHERS:
+        parser.error(f"no {method} attack on {args.rounds} rounds")
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for t in range(args.trials):
+        key = int(args.key, 16) if args.key else int(rng.integers(0, 1 << 32))
+        print(f"secret key {key:08x}, R = {args.rounds}")
+        results.append(attack(key, args.rounds, method, n_pairs=args.pairs, n_sets=args.sets,
+                              tries=args.tries, seed=int(rng.integers(1 << 32))))
+    times = [r["time_total"] for r in results]
+    print(f"{sum(r['success'] for r in results)}/{len(results)} keys recovered, "
+          f"mean {np.mean(times):.2f}s, max {max(times):.2f}s per attack")
+
+if __name__ == "__main__":
+    main()
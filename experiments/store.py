@@ -0,0 +1,272 @@
+# store.py
+"""
+Persistent store of distinguisher results (SQLite).
+
+An experiment is one configuration
+
+    (cipher, rounds, kind, diff, mask, key policy, seed, unit)
+
+where the key policy is "fixed:<8 hex>" (one key) or "random" (a fresh
+key per pair). Its results are kept as raw counters per work unit
+(index, n, hits), with the unit streams of diff_lin/dl_runner.py: unit i
+of seed s always draws the same pairs. So
+
+  * asking for the same experiment with at most the trials already
+    stored is answered from the database; only a last unit cut shorter
+    than the stored one is recomputed (and not stored);
+  * asking for more trials computes only the missing units (extend);
+  * experiments differing only in the seed are independent samples of
+    the same configuration and add up (merge).
+
+Counters of other kinds (integral sets, boomerang quartets, ...) go in
+with add_units(); toy differential-linear runs are computed on demand by
+dl(). query() and best() answer questions such as "best biases seen for
+R = 3".
+
+Usage:
+    python3 store.py dl --diff 00000c0c --mask 0cc0c84c --rounds 3 --trials 16777216
+    python3 store.py best --rounds 3 [--by z] [--merged]
+    python3 store.py list
+"""
+import argparse
+import math
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'diff_lin'))
+
+import dl_runner
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id INTEGER PRIMARY KEY,
+    cipher TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    diff TEXT NOT NULL,
+    mask TEXT NOT NULL,
+    key_policy TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    unit INTEGER NOT NULL,
+    created REAL NOT NULL,
+    UNIQUE (cipher, rounds, kind, diff, mask, key_policy, seed, unit)
+);
+CREATE TABLE IF NOT EXISTS units (
+    experiment INTEGER NOT NULL REFERENCES experiments(id),
+    idx INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (experiment, idx)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    experiment INTEGER NOT NULL REFERENCES experiments(id),
+    trials INTEGER NOT NULL,
+    computed INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS experiments_config ON experiments (cipher, rounds, kind, diff, mask);
+"""
+
+Config = Tuple[str, int, str, str, str, str, int, int]
+
+def key_policy(key) -> str:
+    """'fixed:<hex>' for an int key, 'random' for a key per pair."""
+    return dl_runner.RANDOM_KEY if key == dl_runner.RANDOM_KEY else f"fixed:{key:08x}"
+
+class ResultStore:
+    """Counters of experiments in one SQLite file."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------- Experiments -------------------
+
+    def experiment(self, cipher: str, rounds: int, kind: str, diff: str, mask: str,
+                   policy: str, seed: int, unit: int) -> int:
+        """Id of the experiment, created if new."""
+        config = (cipher, rounds, kind, diff, mask, policy, seed, unit)
+        row = self.db.execute(
+            "SELECT id FROM experiments WHERE cipher=? AND rounds=? AND kind=? AND diff=? AND mask=? "
+            "AND key_policy=? AND seed=? AND unit=?", config).fetchone()
+        if row:
+            return row[0]
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO experiments (cipher, rounds, kind, diff, mask, key_policy, seed, unit, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", config + (time.time(),))
+        return cur.lastrowid
+
+    def units(self, experiment: int) -> Dict[int, Tuple[int, int]]:
+        """{unit index: (n, hits)} stored for the experiment."""
+        return {i: (n, h) for i, n, h in self.db.execute(
+            "SELECT idx, n, hits FROM units WHERE experiment=?", (experiment,))}
+
+    def add_units(self, experiment: int, records: Iterable[Tuple[int, int, int]]):
+        """Store (index, n, hits) records; a record replaces a smaller one of the same unit."""
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO units (experiment, idx, n, hits) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (experiment, idx) DO UPDATE SET n=excluded.n, hits=excluded.hits "
+                "WHERE excluded.n > units.n",
+                [(experiment, i, n, h) for i, n, h in records])
+
+    def log_run(self, experiment: int, trials: int, computed: int, seconds: float):
+        with self.db:
+            self.db.execute("INSERT INTO runs VALUES (?, ?, ?, ?, ?)",
+                            (experiment, trials, computed, seconds, time.time()))
+
+    # ------------------- Toy DL -------------------
+
+    def dl(self, diff: int, masks: Sequence[int], rounds: int, trials: int, seed: int = 0,
+           key=None, unit: int = dl_runner.DEFAULT_UNIT, workers: int = None) -> List[Tuple[int, int]]:
+        """
+        (pairs, agreements) of each mask for a toy DL run, computing only
+        the units the store does not have yet. key: an int, "random", or
+        None for the key dl_runner derives from the seed.
+        """
+        job = dl_runner.make_job(diff, masks, rounds, seed, key, unit)
+        policy = key_policy(job["key"] if job["key"] == dl_runner.RANDOM_KEY else int(job["key"], 16))
+        ids = [self.experiment("toy", rounds, "dl", job["diff"], m, policy, seed, unit) for m in job["masks"]]
+        stored = [self.units(e) for e in ids]
+        sizes = dl_runner.unit_sizes(unit, trials)
+        # a unit is redone for every mask if any mask lacks it at this size;
+        # a record smaller than the stored one is used here but not stored
+        work = [(i, size) for i, size in enumerate(sizes)
+                if any(s.get(i, (0, 0))[0] != size for s in stored)]
+        fresh = {}
+
+        t0 = time.perf_counter()
+        for index, record in dl_runner.run_units(job, work, workers):
+            fresh[index] = record
+            for j, e in enumerate(ids):
+                self.add_units(e, [(index, record[0], record[1 + j])])
+        for e in ids:
+            self.log_run(e, trials, len(work), time.perf_counter() - t0)
+
+        results = []
+        for j, e in enumerate(ids):
+            units = self.units(e)
+            records = [(fresh[i][0], fresh[i][1 + j]) if i in fresh else units[i]
+                       for i in range(len(sizes))]
+            results.append((sum(r[0] for r in records), sum(r[1] for r in records)))
+        return results
+
+    # ------------------- Queries -------------------
+
+    def query(self, cipher: str = None, rounds: int = None, kind: str = None, diff: str = None,
+              mask: str = None, policy: str = None, merged: bool = False) -> List[Dict]:
+        """
+        Every stored experiment matching the filters with its total
+        counters, bias = 2*hits/n - 1 and z = bias*sqrt(n). merged=True
+        adds up experiments that differ only in the seed. Experiments of
+        one seed with different unit sizes draw overlapping pairs (unit i
+        of a seed always starts the same stream), so only the largest of
+        them counts for that seed.
+        """
+        where, args = [], []
+        for column, value in (("cipher", cipher), ("rounds", rounds), ("kind", kind),
+                              ("diff", diff), ("mask", mask), ("key_policy", policy)):
+            if value is not None:
+                where.append(f"e.{column} = ?")
+                args.append(value)
+        config = ["cipher", "rounds", "kind", "diff", "mask", "key_policy"]
+        group = ", ".join(f"e.{c}" for c in config + ["seed", "unit"])
+        rows = self.db.execute(
+            f"SELECT {group}, SUM(u.n), SUM(u.hits) FROM experiments e "
+            f"JOIN units u ON u.experiment = e.id "
+            f"{'WHERE ' + ' AND '.join(where) if where else ''} GROUP BY {group}", args).fetchall()
+        rows = [dict(zip(config + ["seed", "unit", "n", "hits"], row)) for row in rows]
+
+        if merged:
+            # the largest experiment of every seed, then the seeds added up
+            per_seed = {}
+            for r in rows:
+                key = tuple(r[c] for c in config) + (r["seed"],)
+                if key not in per_seed or r["n"] > per_seed[key]["n"]:
+                    per_seed[key] = r
+            totals = {}
+            for r in per_seed.values():
+                t = totals.setdefault(tuple(r[c] for c in config),
+                                      dict({c: r[c] for c in config}, n=0, hits=0, seeds=0))
+                t["n"] += r["n"]
+                t["hits"] += r["hits"]
+                t["seeds"] += 1
+            rows = list(totals.values())
+
+        for r in rows:
+            r["bias"] = 2 * r["hits"] / r["n"] - 1
+            r["z"] = r["bias"] * math.sqrt(r["n"])
+        return rows
+
+    def best(self, rounds: int = None, cipher: str = None, kind: str = "dl", by: str = "bias",
+             min_n: int = 0, limit: int = 10, merged: bool = False) -> List[Dict]:
+        """Stored results with the largest |bias| (or |z|), at least min_n samples."""
+        rows = [r for r in self.query(cipher, rounds, kind, merged=merged) if r["n"] >= min_n]
+        rows.sort(key=lambda r: abs(r[by]), reverse=True)
+        return rows[:limit]
+
+# ------------------- Main -------------------
+
+def print_rows(rows: List[Dict]):
+    for r in rows:
+        seed = f"seed {r['seed']}" if "seed" in r else f"{r['seeds']} seeds"
+        print(f"  {r['cipher']} R={r['rounds']} {r['kind']} Δ {r['diff']} Γ {r['mask']} "
+              f"{r['key_policy']} {seed}: n = {r['n']}, bias {r['bias']:+.6f} (z = {r['z']:+.1f})")
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="SQLite store of distinguisher results")
+    parser.add_argument("command", choices=["dl", "best", "list"])
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--diff", help="input difference, 8 hex nibbles")
+    parser.add_argument("--mask", nargs="+", help="output mask(s), 8 hex nibbles")
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--trials", type=int, default=1 << 24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--key", default=None, help="8 hex characters, 'random', or derived from the seed")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--by", choices=["bias", "z"], default="bias")
+    parser.add_argument("--min-n", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--merged", action="store_true", help="add up runs that differ only in the seed")
+    args = parser.parse_args(argv)
+
+    with ResultStore(args.db) as store:
+        if args.command == "dl":
+            if not (args.diff and args.mask):
+                parser.error("dl needs --diff and --mask")
+            key = args.key if args.key in (None, dl_runner.RANDOM_KEY) else int(args.key, 16)
+            t0 = time.perf_counter()
+            results = store.dl(int(args.diff, 16), [int(m, 16) for m in args.mask], args.rounds or 3,
+                               args.trials, args.seed, key, workers=args.workers)
+            print(f"{time.perf_counter() - t0:.2f}s")
+            for mask, (n, hits) in zip(args.mask, results):
+                bias = 2 * hits / n - 1
+                print(f"  mask {mask}: {n} pairs, bias {bias:+.6f} (z = {bias * math.sqrt(n):+.2f})")
+        elif args.command == "best":
+            print_rows(store.best(args.rounds, by=args.by, min_n=args.min_n, limit=args.limit,
+                                  merged=args.merged))
+        else:
+            print_rows(store.query(rounds=args.rounds))
+
+if __name__ == "__main__":
+    main()
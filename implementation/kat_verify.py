@@ -0,0 +1,195 @@
+# kat_verify.py
+"""
+Check the Saturnin-Short known-answer tests against every backend.
+
+The KAT file is read one record at a time and cut into shards; a process
+pool runs each shard through every selected backend. Each vector is
+encrypted and the result is compared with CT, and CT is decrypted back
+to the nonce and PT. Vectors that Saturnin-Short cannot express (non-empty
+AD or PT longer than 15 bytes) are counted as skipped.
+
+Backends:
+    python   saturnin.py, one block at a time
+    batch    saturnin_batch.py, one call per shard with per-vector keys
+    c        saturnin.c through saturnin_native.py, one block at a time
+    c-batch  saturnin.c, one saturnin_block_*_many call per shard
+The C backends are only offered when the native library could be built.
+
+Usage:
+    python3 kat_verify.py [KAT_FILE] [--backends python,c] [--workers N] [--shard-size N]
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+import saturnin
+import saturnin_batch
+import saturnin_native
+from saturnin_short import D, MAX_PT_BYTES, R, short_block, short_open
+
+DEFAULT_KAT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "LWC_AEAD_KAT_256_128.txt")
+DEFAULT_SHARD = 256
+
+# ------------------- KAT Reader -------------------
+
+def read_kat(path: str) -> Iterator[Dict]:
+    """Yield one dict per record (Count, Key, Nonce, PT, AD, CT), streaming the file."""
+    vec = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                if vec:
+                    yield vec
+                vec = {}
+                continue
+            name, _, value = line.partition("=")
+            name, value = name.strip(), value.strip()
+            vec[name] = int(value) if name == "Count" else bytes.fromhex(value)
+    if vec:
+        yield vec
+
+def shards(vectors: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    shard = []
+    for vec in vectors:
+        shard.append(vec)
+        if len(shard) == size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def supported(vec: Dict) -> bool:
+    return not vec["AD"] and len(vec["PT"]) <= MAX_PT_BYTES and len(vec["CT"]) == 32
+
+# ------------------- Backends -------------------
+
+def _check_scalar(encrypt, decrypt, shard: List[Dict]) -> List[int]:
+    bad = []
+    for vec in shard:
+        ct = encrypt(R, D, vec["Key"], short_block(vec["Nonce"], vec["PT"]))
+        try:
+            pt = short_open(vec["Nonce"], decrypt(R, D, vec["Key"], vec["CT"]))
+        except ValueError:
+            pt = None
+        if ct != vec["CT"] or pt != vec["PT"]:
+            bad.append(vec["Count"])
+    return bad
+
+def _check_batch(encrypt, decrypt, shard: List[Dict]) -> List[int]:
+    keys = np.array([np.frombuffer(v["Key"], dtype=np.uint8) for v in shard])
+    pts = np.array([np.frombuffer(short_block(v["Nonce"], v["PT"]), dtype=np.uint8)
+                    for v in shard])
+    cts = np.array([np.frombuffer(v["CT"], dtype=np.uint8) for v in shard])
+    enc = encrypt(R, D, keys, pts)
+    dec = decrypt(R, D, keys, cts)
+    enc_ok = (enc == cts).all(axis=1)
+    dec_ok = (dec == pts).all(axis=1)
+    return [v["Count"] for v, e, d in zip(shard, enc_ok, dec_ok) if not (e and d)]
+
+BACKENDS = {
+    "python": lambda shard: _check_scalar(
+        saturnin.saturnin_block_encrypt, saturnin.saturnin_block_decrypt, shard),
+    "batch": lambda shard: _check_batch(
+        saturnin_batch.saturnin_block_encrypt_batch,
+        saturnin_batch.saturnin_block_decrypt_batch, shard),
+    "c": lambda shard: _check_scalar(
+        saturnin_native.saturnin_block_encrypt, saturnin_native.saturnin_block_decrypt, shard),
+    "c-batch": lambda shard: _check_batch(
+        saturnin_native.saturnin_block_encrypt_batch,
+        saturnin_native.saturnin_block_decrypt_batch, shard),
+}
+
+def available_backends() -> List[str]:
+    names = ["python", "batch"]
+    if saturnin_native.available():
+        names += ["c", "c-batch"]
+    return names
+
+# ------------------- Worker -------------------
+
+def run_shard(args):
+    """Check one shard; returns (n_checked, n_skipped, {backend: (mismatches, seconds)})."""
+    shard, backends = args
+    todo = [v for v in shard if supported(v)]
+    results = {}
+    for name in backends:
+        t0 = time.perf_counter()
+        bad = BACKENDS[name](todo) if todo else []
+        results[name] = (bad, time.perf_counter() - t0)
+    return len(todo), len(shard) - len(todo), results
+
+# ------------------- Driver -------------------
+
+def verify(path: str = DEFAULT_KAT, backends: List[str] = None, workers: int = None,
+           shard_size: int = DEFAULT_SHARD) -> Dict:
+    """Run the KAT file through 'backends'; returns per-backend mismatches and timings."""
+    backends = backends or available_backends()
+    for name in backends:
+        if name not in available_backends():
+            raise ValueError(f"backend not available: {name}")
+    summary = {name: {"mismatches": [], "seconds": 0.0} for name in backends}
+    checked = skipped = 0
+
+    work = ((shard, backends) for shard in shards(read_kat(path), shard_size))
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    if workers == 1:
+        results = map(run_shard, work)
+        pool = None
+    else:
+        pool = Pool(workers)
+        results = pool.imap_unordered(run_shard, work)
+    try:
+        for n, s, per_backend in results:
+            checked += n
+            skipped += s
+            for name, (bad, seconds) in per_backend.items():
+                summary[name]["mismatches"] += bad
+                summary[name]["seconds"] += seconds
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    for entry in summary.values():
+        entry["mismatches"].sort()
+    return {"checked": checked, "skipped": skipped,
+            "wall_seconds": time.perf_counter() - t0, "backends": summary}
+
+def print_report(report: Dict):
+    print(f"Vectors checked: {report['checked']}  skipped: {report['skipped']}  "
+          f"wall time: {report['wall_seconds']:.2f}s")
+    for name, entry in report["backends"].items():
+        seconds = entry["seconds"]
+        rate = report["checked"] / seconds if seconds > 0 else float("inf")
+        status = "OK" if not entry["mismatches"] else f"{len(entry['mismatches'])} MISMATCHES"
+        print(f"  {name:8s} {status:16s} {seconds:8.3f}s CPU  {rate:12.0f} vectors/s")
+        if entry["mismatches"]:
+            print("           Count =", ", ".join(map(str, entry["mismatches"][:20])),
+                  "..." if len(entry["mismatches"]) > 20 else "")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify Saturnin-Short KATs on every backend")
+    parser.add_argument("kat", nargs="?", default=DEFAULT_KAT)
+    parser.add_argument("--backends", default=None,
+                        help="comma-separated subset of " + ",".join(BACKENDS)
+                        + " (default: all available)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD, help="vectors per work unit")
+    args = parser.parse_args(argv)
+
+    backends = args.backends.split(",") if args.backends else None
+    report = verify(args.kat, backends, args.workers, args.shard_size)
+    print_report(report)
+    failed = any(entry["mismatches"] for entry in report["backends"].values())
+    return 1 if failed or report["checked"] == 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,17 @@
  */
 
 #include <string.h>
+#include <stddef.h>
 #include <stdint.h>
 #include <stdio.h>
 
-// print state to see it in between functions 
+// print state to see it in between functions
 // for debugging and educational purposes
+// build with -DSATURNIN_NO_TRACE to compile the printing out entirely
+// (this is what the shared library used from Python does)
+#ifdef SATURNIN_NO_TRACE
+#define print_state(state, label, round, phase)   ((void)0)
+#else
 static void print_state(uint16_t *state, const char *label, int round, const char *phase) {
     printf("%s - Round %2d [%s]:\n", label, round, phase);
     for (int i = 0; i < 16; i++) {
@@ -18,6 +24,7 @@ static void print_state(uint16_t *state, const char *label, int round, const cha
     }
     printf("\n");
 }
+#endif
 
 /*
  * Compute round constants for R super-rounds and domain D.
@@ -399,48 +406,15 @@ XOR_key_rotated(const uint16_t *key, uint16_t *state)
 }
 
 /*
- * Perform one Saturnin block encryption.
- *   R     number of super-rounds (0 to 31)
- *   D     separation domain (0 to 15)
- *   key   key (32 bytes)
- *   buf   block to encrypt
- * The 'key' and 'buf' buffers may overlap. The encrypted block is
- * written back in 'buf'.
+ * Run the whole encryption on a decoded state: initial key XOR, then
+ * R super-rounds. RC0/RC1 come from make_round_constants().
  */
-void
-saturnin_block_encrypt(int R, int D, const uint8_t *key, uint8_t *buf)
+static void
+encrypt_state(int R, const uint16_t *RC0, const uint16_t *RC1,
+	const uint16_t *xk, uint16_t *xb)
 {
-	// arrays of 16 bit round constants
-	// for saturnin short, R is 10 and D is 6
-	uint16_t RC0[31], RC1[31];
-
-	// xk is the key block
-	// xb is the state block
-	// an array of size 16 of unsigned 16 bit integer => 16*16 = 256
-	uint16_t xk[16], xb[16];
-
-	// global variable for iteration
 	int i;
 
-	/*
-	 * Decode key and input block buffer and put in xk and xb
-	 */
-	// for each 16 bit int in xk and xb 
-	// there is a low byte and there is a high byte
-	// the low byte is key of i*2 and high byte is key of i*2 + 1
-	// so for i = 0, key0 and key1 are xk0
-	// for i = 1, key2 and key3 are xk1 etc
-	for (i = 0; i < 16; i ++) {
-		xk[i] = key[i << 1] + ((uint16_t)key[(i << 1) + 1] << 8);
-		xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
-	}
-
-	/*
-	 * Compute round constants.
-	 * fill the round constant arrays with appropriate round constants
-	 */
-	make_round_constants(R, D, RC0, RC1);
-	
 	print_state(xb, "Encrypt", -1, "Initial");
 	/*
 	 * XOR key into state.
@@ -492,45 +466,18 @@ saturnin_block_encrypt(int R, int D, const uint8_t *key, uint8_t *buf)
 			print_state(xb, "Encrypt", i, "Odd (Sheet)");
 		}
 	}
-
-	/*
-	 * Encode output block.
-	 */
-	for (i = 0; i < 16; i ++) {
-		buf[(i << 1) + 0] = (uint8_t)xb[i];
-		buf[(i << 1) + 1] = (uint8_t)(xb[i] >> 8);
-	}
 }
 
 /*
- * Perform one Saturnin block decryption.
- *   R     number of super-rounds (0 to 31)
- *   D     separation domain (0 to 15)
- *   key   key (32 bytes)
- *   buf   block to decrypt
- * The 'key' and 'buf' buffers may overlap. The decrypted block is
- * written back in 'buf'.
+ * Run the whole decryption on a decoded state: R super-rounds in
+ * reverse, then the final key XOR.
  */
-void
-saturnin_block_decrypt(int R, int D, const uint8_t *key, uint8_t *buf)
+static void
+decrypt_state(int R, const uint16_t *RC0, const uint16_t *RC1,
+	const uint16_t *xk, uint16_t *xb)
 {
-	uint16_t RC0[31], RC1[31];
-	uint16_t xk[16], xb[16];
 	int i;
 
-	/*
-	 * Decode key and input block.
-	 */
-	for (i = 0; i < 16; i ++) {
-		xk[i] = key[i << 1] + ((uint16_t)key[(i << 1) + 1] << 8);
-		xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
-	}
-
-	/*
-	 * Compute round constants.
-	 */
-	make_round_constants(R, D, RC0, RC1);
-
 	/*
 	 * Run all rounds (two rounds per super-round).
 	 */
@@ -575,6 +522,52 @@ saturnin_block_decrypt(int R, int D, const uint8_t *key, uint8_t *buf)
 	 * XOR key into state.
 	 */
 	XOR_key(xk, xb);
+}
+
+/*
+ * Perform one Saturnin block encryption.
+ *   R     number of super-rounds (0 to 31)
+ *   D     separation domain (0 to 15)
+ *   key   key (32 bytes)
+ *   buf   block to encrypt
+ * The 'key' and 'buf' buffers may overlap. The encrypted block is
+ * written back in 'buf'.
+ */
+void
+saturnin_block_encrypt(int R, int D, const uint8_t *key, uint8_t *buf)
+{
+	// arrays of 16 bit round constants
+	// for saturnin short, R is 10 and D is 6
+	uint16_t RC0[31], RC1[31];
+
+	// xk is the key block
+	// xb is the state block
+	// an array of size 16 of unsigned 16 bit integer => 16*16 = 256
+	uint16_t xk[16], xb[16];
+
+	// global variable for iteration
+	int i;
+
+	/*
+	 * Decode key and input block buffer and put in xk and xb
+	 */
+	// for each 16 bit int in xk and xb 
+	// there is a low byte and there is a high byte
+	// the low byte is key of i*2 and high byte is key of i*2 + 1
+	// so for i = 0, key0 and key1 are xk0
+	// for i = 1, key2 and key3 are xk1 etc
+	for (i = 0; i < 16; i ++) {
+		xk[i] = key[i << 1] + ((uint16_t)key[(i << 1) + 1] << 8);
+		xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
+	}
+
+	/*
+	 * Compute round constants.
+	 * fill the round constant arrays with appropriate round constants
+	 */
+	make_round_constants(R, D, RC0, RC1);
+
+	encrypt_state(R, RC0, RC1, xk, xb);
 
 	/*
 	 * Encode output block.
@@ -584,3 +577,111 @@ saturnin_block_decrypt(int R, int D, const uint8_t *key, uint8_t *buf)
 		buf[(i << 1) + 1] = (uint8_t)(xb[i] >> 8);
 	}
 }
+
+/*
+ * Perform one Saturnin block decryption.
+ *   R     number of super-rounds (0 to 31)
+ *   D     separation domain (0 to 15)
+ *   key   key (32 bytes)
+ *   buf   block to decrypt
+ * The 'key' and 'buf' buffers may overlap. The decrypted block is
+ * written back in 'buf'.
+ */
+void
+saturnin_block_decrypt(int R, int D, const uint8_t *key, uint8_t *buf)
+{
+	uint16_t RC0[31], RC1[31];
+	uint16_t xk[16], xb[16];
+	int i;
+
+	/*
+	 * Decode key and input block.
+	 */
+	for (i = 0; i < 16; i ++) {
+		xk[i] = key[i << 1] + ((uint16_t)key[(i << 1) + 1] << 8);
+		xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
+	}
+
+	/*
+	 * Compute round constants.
+	 */
+	make_round_constants(R, D, RC0, RC1);
+
+	decrypt_state(R, RC0, RC1, xk, xb);
+
+	/*
+	 * Encode output block.
+	 */
+	for (i = 0; i < 16; i ++) {
+		buf[(i << 1) + 0] = (uint8_t)xb[i];
+		buf[(i << 1) + 1] = (uint8_t)(xb[i] >> 8);
+	}
+}
+
+/*
+ * Encrypt 'n' consecutive 32-byte blocks of 'buf' in place, in one call.
+ * Block j uses the key at key + j * key_stride: with key_stride = 0 every
+ * block uses the same key, which is then decoded only once (as are the
+ * round constants); key_stride = 32 gives one key per block.
+ */
+void
+saturnin_block_encrypt_many(int R, int D, const uint8_t *key,
+	size_t key_stride, uint8_t *buf, size_t n)
+{
+	uint16_t RC0[31], RC1[31];
+	uint16_t xk[16], xb[16];
+	size_t j;
+	int i;
+
+	make_round_constants(R, D, RC0, RC1);
+	for (j = 0; j < n; j ++, buf += 32) {
+		if (j == 0 || key_stride != 0) {
+			const uint8_t *k = key + j * key_stride;
+
+			for (i = 0; i < 16; i ++) {
+				xk[i] = k[i << 1] + ((uint16_t)k[(i << 1) + 1] << 8);
+			}
+		}
+		for (i = 0; i < 16; i ++) {
+			xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
+		}
+		encrypt_state(R, RC0, RC1, xk, xb);
+		for (i = 0; i < 16; i ++) {
+			buf[(i << 1) + 0] = (uint8_t)xb[i];
+			buf[(i << 1) + 1] = (uint8_t)(xb[i] >> 8);
+		}
+	}
+}
+
+/*
+ * Decrypt 'n' consecutive 32-byte blocks of 'buf' in place; the key
+ * layout is the same as for saturnin_block_encrypt_many().
+ */
+void
+saturnin_block_decrypt_many(int R, int D, const uint8_t *key,
+	size_t key_stride, uint8_t *buf, size_t n)
+{
+	uint16_t RC0[31], RC1[31];
+	uint16_t xk[16], xb[16];
+	size_t j;
+	int i;
+
+	make_round_constants(R, D, RC0, RC1);
+	for (j = 0; j < n; j ++, buf += 32) {
+		if (j == 0 || key_stride != 0) {
+			const uint8_t *k = key + j * key_stride;
+
+			for (i = 0; i < 16; i ++) {
+				xk[i] = k[i << 1] + ((uint16_t)k[(i << 1) + 1] << 8);
+			}
+		}
+		for (i = 0; i < 16; i ++) {
+			xb[i] = buf[i << 1] + ((uint16_t)buf[(i << 1) + 1] << 8);
+		}
+		decrypt_state(R, RC0, RC1, xk, xb);
+		for (i = 0; i < 16; i ++) {
+			buf[(i << 1) + 0] = (uint8_t)xb[i];
+			buf[(i << 1) + 1] = (uint8_t)(xb[i] >> 8);
+		}
+	}
+}
@@ -1,9 +1,6 @@
 # saturnin_full.py
-from typing import List
-
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import animation
+from functools import lru_cache
+from typing import Callable, List, Optional
 
 # ------------------- Utilities -------------------
 
@@ -17,6 +14,10 @@ def from_words(words: List[int]) -> bytes:
         out.append((w >> 8) & 0xFF)
     return bytes(out)
 
+# A tracer is called as tracer(state, label, round_num, phase) after every
+# half-round; print_state is one, see tracing.py for capturing ones.
+Tracer = Callable[[List[int], str, int, str], None]
+
 def print_state(state: List[int], label: str, round_num: int, phase: str):
     print(f"\n{label} - Round {round_num:02d} [{phase}]")
     for i in range(16):
@@ -28,6 +29,7 @@ def print_state(state: List[int], label: str, round_num: int, phase: str):
 
 # ------------------- Round Constants -------------------
 
+@lru_cache(maxsize=None)
 def make_round_constants(R:int,D:int):
     RC0,RC1 = [0]*R,[0]*R
     x0 = x1 = D + (R << 4) + 0xFE00
@@ -36,7 +38,8 @@ def make_round_constants(R:int,D:int):
             x0 = ((x0 << 1) ^ (0x2D if x0 & 0x8000 else 0)) & 0xFFFF
             x1 = ((x1 << 1) ^ (0x53 if x1 & 0x8000 else 0)) & 0xFFFF
         RC0[n]=x0; RC1[n]=x1
-    return RC0,RC1
+    # cached, so hand out immutable tuples
+    return tuple(RC0),tuple(RC1)
 
 # ------------------- S-box -------------------
 
@@ -84,7 +87,7 @@ def MDS(state: List[int]):
 def MDS_inv(state: List[int]):
     x = state.copy()
     def MULinv(t0,t1,t2,t3):
-        return t3,t0^t1,t1,t2
+        return t3^t0,t0,t1,t2
     x0,x1,x2,x3,x4,x5,x6,x7,x8,x9,xa,xb,xc,xd,xe,xf = x
     x4 ^= x8; x5 ^= x9; x6 ^= xa; x7 ^= xb
     xc ^= x0; xd ^= x1; xe ^= x2; xf ^= x3
@@ -138,79 +141,116 @@ def XOR_key_rotated(key: List[int], state: List[int]):
     for i in range(16):
         state[i] ^= ((key[i]<<11) | (key[i]>>5)) & 0xFFFF
 
-# ------------------- Block Encrypt -------------------
+# ------------------- Key Schedule -------------------
 
-def saturnin_block_encrypt(R:int, D:int, key_bytes:bytes, buf:bytes) -> bytes:
-    RC0, RC1 = make_round_constants(R,D)
-    xk = to_words(key_bytes)
-    xb = to_words(buf[:32])
-    
-    XOR_key(xk, xb)
-    
-    for i in range(R):
-        # Even round
-        S_box(xb)
-        MDS(xb)
-        print_state(xb, "Encrypt", i, "Even")
-        
-        # Odd round
-        S_box(xb)
-        if (i & 1) == 0:
-            # r = 1 mod 4
-            SR_slice(xb)
-            MDS(xb)
-            SR_slice_inv(xb)
-            xb[0] ^= RC0[i]; xb[8] ^= RC1[i]
-            XOR_key_rotated(xk, xb)
-            print_state(xb, "Encrypt", i, "Odd Slice")
-        else:
-            # r = 3 mod 4
-            SR_sheet(xb)
-            MDS(xb)
-            SR_sheet_inv(xb)
-            xb[0] ^= RC0[i]; xb[8] ^= RC1[i]
-            XOR_key(xk, xb)
-            print_state(xb, "Encrypt", i, "Odd Sheet")
-    
-    return from_words(xb)
+class SaturninKey:
+    """
+    Key context for one (key, R, D): the round constants, the plain and
+    rotated key words, and the per-round schedule in both directions are
+    computed once here instead of on every block.
+    """
 
-# ------------------- Block Decrypt -------------------
-def saturnin_block_decrypt(R:int, D:int, key_bytes:bytes, buf:bytes) -> bytes:
-    RC0, RC1 = make_round_constants(R,D)
-    xk = to_words(key_bytes)
-    xb = to_words(buf[:32])
-
-    # Initial XOR with key (mirrors encrypt)
-    XOR_key(xk, xb)
-
-    # Reverse rounds
-    for i in reversed(range(R)):
-        # Odd round
-        if (i & 1) == 0:
-            # Odd slice round
-            XOR_key_rotated(xk, xb)
-            xb[0] ^= RC0[i]
-            xb[8] ^= RC1[i]
-            # Reverse slice permutation + diffusion
-            SR_slice(xb)
-            MDS_inv(xb)
-            SR_slice_inv(xb)
-            S_box_inv(xb)
-        else:
-            # Odd sheet round
-            XOR_key(xk, xb)
-            xb[0] ^= RC0[i]
-            xb[8] ^= RC1[i]
-            SR_sheet(xb)
+    def __init__(self, key_bytes: bytes, R: int, D: int):
+        self.R = R
+        self.D = D
+        self.RC0, self.RC1 = make_round_constants(R, D)
+        self.xk = to_words(key_bytes)
+        self.xk_rot = [((k << 11) | (k >> 5)) & 0xFFFF for k in self.xk]
+        # (round, RC0, RC1, round key); slice rounds use the rotated key
+        self.schedule = [
+            (i, self.RC0[i], self.RC1[i], self.xk_rot if (i & 1) == 0 else self.xk)
+            for i in range(R)
+        ]
+        self.inv_schedule = self.schedule[::-1]
+
+    def encrypt(self, buf: bytes, tracer: Optional[Tracer] = None) -> bytes:
+        xk = self.xk
+        xb = to_words(buf[:32])
+
+        XOR_key(xk, xb)
+
+        for i, rc0, rc1, rk in self.schedule:
+            # Even round
+            S_box(xb)
+            MDS(xb)
+            if tracer is not None:
+                tracer(xb, "Encrypt", i, "Even")
+
+            # Odd round
+            S_box(xb)
+            if (i & 1) == 0:
+                # r = 1 mod 4
+                SR_slice(xb)
+                MDS(xb)
+                SR_slice_inv(xb)
+                xb[0] ^= rc0; xb[8] ^= rc1
+                XOR_key(rk, xb)
+                if tracer is not None:
+                    tracer(xb, "Encrypt", i, "Odd Slice")
+            else:
+                # r = 3 mod 4
+                SR_sheet(xb)
+                MDS(xb)
+                SR_sheet_inv(xb)
+                xb[0] ^= rc0; xb[8] ^= rc1
+                XOR_key(rk, xb)
+                if tracer is not None:
+                    tracer(xb, "Encrypt", i, "Odd Sheet")
+
+        return from_words(xb)
+
+    def decrypt(self, buf: bytes, tracer: Optional[Tracer] = None) -> bytes:
+        xb = to_words(buf[:32])
+
+        # Reverse rounds
+        for i, rc0, rc1, rk in self.inv_schedule:
+            # Odd round
+            XOR_key(rk, xb)
+            xb[0] ^= rc0
+            xb[8] ^= rc1
+            if (i & 1) == 0:
+                # Reverse slice permutation + diffusion
+                SR_slice(xb)
+                MDS_inv(xb)
+                SR_slice_inv(xb)
+                S_box_inv(xb)
+                if tracer is not None:
+                    tracer(xb, "Decrypt", i, "Odd Slice")
+            else:
+                # Reverse sheet permutation + diffusion
+                SR_sheet(xb)
+                MDS_inv(xb)
+                SR_sheet_inv(xb)
+                S_box_inv(xb)
+                if tracer is not None:
+                    tracer(xb, "Decrypt", i, "Odd Sheet")
+
+            # Even round
             MDS_inv(xb)
-            SR_sheet_inv(xb)
             S_box_inv(xb)
+            if tracer is not None:
+                tracer(xb, "Decrypt", i, "Even")
+
+        # Final XOR with key (undoes the initial key XOR of encrypt)
+        XOR_key(self.xk, xb)
+
+        return from_words(xb)
 
-        # Even round
-        MDS_inv(xb)
-        S_box_inv(xb)
+@lru_cache(maxsize=1024)
+def saturnin_key(key_bytes: bytes, R: int, D: int) -> SaturninKey:
+    """Cached SaturninKey: repeated (key, R, D) triples reuse one context."""
+    return SaturninKey(key_bytes, R, D)
 
-    return from_words(xb)
+# ------------------- Block Encrypt -------------------
+
+def saturnin_block_encrypt(R:int, D:int, key_bytes:bytes, buf:bytes,
+                           tracer: Optional[Tracer] = None) -> bytes:
+    return saturnin_key(bytes(key_bytes[:32]), R, D).encrypt(buf, tracer)
+
+# ------------------- Block Decrypt -------------------
+def saturnin_block_decrypt(R:int, D:int, key_bytes:bytes, buf:bytes,
+                           tracer: Optional[Tracer] = None) -> bytes:
+    return saturnin_key(bytes(key_bytes[:32]), R, D).decrypt(buf, tracer)
 
 # ------------------- Test Vectors -------------------
 
@@ -241,7 +281,7 @@ if __name__ == "__main__":
     # Test Vector 1
     PT1 = b""
     buf1 = NONCE + PT1 + b'\x80' + b'\x00'*(15-len(PT1))
-    CT1 = saturnin_block_encrypt(R,D,KEY,buf1)
+    CT1 = saturnin_block_encrypt(R,D,KEY,buf1,tracer=print_state)
     print("--- Test Vector 1 ---")
     print("Plaintext (PT):", PT1.hex())
     print("Ciphertext (CT):", CT1.hex())
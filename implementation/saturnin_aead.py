@@ -0,0 +1,229 @@
+# saturnin_aead.py
+"""
+Saturnin-CTR-Cascade AEAD (256-bit key, 128-bit nonce, 256-bit tag).
+
+Encryption is CTR mode with domain 1. Authentication is the Cascade
+construction: the chaining value is used as the key to encrypt each block,
+and the block is XORed back in,
+    cc = E_cc(block) ^ block,
+starting from the key and the padded nonce (domain 2). Associated data is
+absorbed with domains 2 (full blocks) and 3 (final padded block), the
+ciphertext with domains 4 and 5. The final chaining value is the tag.
+
+The streaming objects let arbitrarily long messages go through in pieces.
+CTR keystream is produced by the batch engine, many blocks per call.
+"""
+import hmac
+
+import numpy as np
+
+from saturnin import SaturninKey
+from saturnin_batch import saturnin_block_encrypt_batch
+
+R = 10
+D_CTR = 1
+D_AD, D_AD_LAST = 2, 3
+D_CT, D_CT_LAST = 4, 5
+
+KEY_BYTES = 32
+NONCE_BYTES = 16
+TAG_BYTES = 32
+
+# number of keystream blocks produced per batch call
+KEYSTREAM_BATCH = 2048
+
+# ------------------- Helpers -------------------
+
+def pad(data: bytes) -> bytes:
+    """Pad a partial block (< 32 bytes) with 0x80 and zeros."""
+    return bytes(data) + b"\x80" + b"\x00" * (31 - len(data))
+
+def xor_bytes(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+def cascade_block(cc: bytes, block: bytes, D: int) -> bytes:
+    """One Cascade step: E_cc(block) ^ block."""
+    # every chaining value is a fresh key, so skip the saturnin_key cache
+    return xor_bytes(SaturninKey(cc, R, D).encrypt(block), block)
+
+def counter_blocks(nonce: bytes, start: int, n: int) -> np.ndarray:
+    """
+    (n, 32) array of CTR inputs: padded nonce with a 32-bit big-endian
+    block counter in the last four bytes, counting from 'start'.
+    """
+    blocks = np.empty((n, 32), dtype=np.uint8)
+    blocks[:] = np.frombuffer(pad(nonce), dtype=np.uint8)
+    ctr = np.arange(start, start + n, dtype=np.uint64)
+    if start + n - 1 > 0xFFFFFFFF:
+        raise OverflowError("CTR block counter exhausted")
+    blocks[:, 28:32] = ctr.astype(">u4").view(np.uint8).reshape(n, 4)
+    return blocks
+
+# ------------------- Streaming State -------------------
+
+class _CtrCascade:
+    """Shared CTR keystream and Cascade bookkeeping for both directions."""
+
+    def __init__(self, key: bytes, nonce: bytes, batch_blocks: int = KEYSTREAM_BATCH):
+        if len(key) != KEY_BYTES:
+            raise ValueError("key must be 32 bytes")
+        if len(nonce) != NONCE_BYTES:
+            raise ValueError("nonce must be 16 bytes")
+        self.key = bytes(key)
+        self.nonce = bytes(nonce)
+        self.batch_blocks = batch_blocks
+
+        # keystream buffer and the counter of the next block to generate
+        self._ks = b""
+        self._ks_pos = 0
+        self._counter = 1
+
+        # Cascade chaining value, pending partial block, current phase
+        self._cc = cascade_block(self.key, pad(self.nonce), D_AD)
+        self._pending = bytearray()
+        self._in_ad = True
+        self._done = False
+
+    # ---------- Cascade ----------
+
+    def _absorb(self, data, D: int):
+        view = memoryview(data)
+        if self._pending:
+            take = min(32 - len(self._pending), len(view))
+            self._pending += view[:take]
+            view = view[take:]
+            if len(self._pending) < 32:
+                return
+            self._cc = cascade_block(self._cc, self._pending, D)
+            self._pending = bytearray()
+        full = len(view) - len(view) % 32
+        cc = self._cc
+        for i in range(0, full, 32):
+            cc = cascade_block(cc, view[i:i + 32], D)
+        self._cc = cc
+        self._pending += view[full:]
+
+    def _close_ad(self):
+        if self._in_ad:
+            self._cc = cascade_block(self._cc, pad(self._pending), D_AD_LAST)
+            self._pending = bytearray()
+            self._in_ad = False
+
+    def update_ad(self, data: bytes):
+        """Absorb associated data. All of it must come before the message."""
+        if self._done:
+            raise ValueError("already finalized")
+        if not self._in_ad:
+            raise ValueError("associated data must precede the message")
+        self._absorb(data, D_AD)
+
+    # ---------- CTR ----------
+
+    def _keystream(self, n: int) -> bytes:
+        out = []
+        while n > 0:
+            if self._ks_pos == len(self._ks):
+                nb = max(self.batch_blocks, 1)
+                self._ks = saturnin_block_encrypt_batch(
+                    R, D_CTR, self.key, counter_blocks(self.nonce, self._counter, nb)
+                ).tobytes()
+                self._counter += nb
+                self._ks_pos = 0
+            take = min(n, len(self._ks) - self._ks_pos)
+            out.append(self._ks[self._ks_pos:self._ks_pos + take])
+            self._ks_pos += take
+            n -= take
+        return b"".join(out)
+
+    def _crypt(self, data) -> bytes:
+        ks = np.frombuffer(self._keystream(len(data)), dtype=np.uint8)
+        return np.bitwise_xor(np.frombuffer(data, dtype=np.uint8), ks).tobytes()
+
+    def _tag(self) -> bytes:
+        if self._done:
+            raise ValueError("already finalized")
+        self._close_ad()
+        self._cc = cascade_block(self._cc, pad(self._pending), D_CT_LAST)
+        self._pending = bytearray()
+        self._done = True
+        return self._cc
+
+class SaturninEncryptor(_CtrCascade):
+    """
+    Incremental Saturnin-CTR-Cascade encryption:
+        enc = SaturninEncryptor(key, nonce)
+        enc.update_ad(ad)          # optional, any number of calls
+        ct = enc.update(chunk)     # any number of calls
+        tag = enc.finalize()
+    """
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("already finalized")
+        self._close_ad()
+        ct = self._crypt(data)
+        self._absorb(ct, D_CT)
+        return ct
+
+    def finalize(self) -> bytes:
+        return self._tag()
+
+class SaturninDecryptor(_CtrCascade):
+    """
+    Incremental Saturnin-CTR-Cascade decryption. update() returns
+    plaintext that is unauthenticated until finalize(tag) succeeds;
+    finalize raises ValueError on a tag mismatch.
+    """
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("already finalized")
+        self._close_ad()
+        self._absorb(data, D_CT)
+        return self._crypt(data)
+
+    def finalize(self, tag: bytes):
+        if not hmac.compare_digest(self._tag(), bytes(tag)):
+            raise ValueError("authentication failed")
+
+# ------------------- One-shot API -------------------
+
+def saturnin_ctr_cascade_encrypt(key: bytes, nonce: bytes, pt: bytes, ad: bytes = b"") -> bytes:
+    """Return ciphertext || 32-byte tag."""
+    enc = SaturninEncryptor(key, nonce)
+    enc.update_ad(ad)
+    ct = enc.update(pt)
+    return ct + enc.finalize()
+
+def saturnin_ctr_cascade_decrypt(key: bytes, nonce: bytes, ct: bytes, ad: bytes = b"") -> bytes:
+    """Check the tag of ciphertext || tag and return the plaintext (ValueError if invalid)."""
+    if len(ct) < TAG_BYTES:
+        raise ValueError("ciphertext shorter than the tag")
+    dec = SaturninDecryptor(key, nonce)
+    dec.update_ad(ad)
+    pt = dec.update(ct[:-TAG_BYTES])
+    dec.finalize(ct[-TAG_BYTES:])
+    return pt
+
+# ------------------- Main -------------------
+if __name__ == "__main__":
+    import os
+    import time
+
+    KEY = bytes(range(32))
+    NONCE = bytes(range(16))
+    AD = b"header"
+    MSG = os.urandom(1 << 20)
+    CHUNK = 64 * 1024
+
+    t0 = time.perf_counter()
+    enc = SaturninEncryptor(KEY, NONCE)
+    enc.update_ad(AD)
+    ct = b"".join(enc.update(MSG[i:i + CHUNK]) for i in range(0, len(MSG), CHUNK))
+    tag = enc.finalize()
+    t1 = time.perf_counter()
+
+    pt = saturnin_ctr_cascade_decrypt(KEY, NONCE, ct + tag, AD)
+    print(f"Encrypted {len(MSG)} bytes in {t1 - t0:.2f}s ({len(MSG) / (t1 - t0) / 1024:.0f} KiB/s)")
+    print("Tag:", tag.hex())
+    print("Round trip ok:", pt == MSG)
@@ -0,0 +1,142 @@
+# saturnin_file.py
+"""
+Bulk file encryption/decryption with Saturnin in counter mode.
+
+The input file is memory-mapped and split into chunks; a process pool
+encrypts the chunks in parallel and every worker writes its result
+straight into a memory-mapped output file of the same size. Keystream
+block i is E_K(padded nonce with 32-bit big-endian counter 1 + i), the
+same CTR layout as saturnin_aead.py. CTR is its own inverse, so
+'decrypt' runs exactly the same operation. There is no authentication
+tag: use saturnin_aead.py when integrity matters.
+
+Usage:
+    python3 saturnin_file.py encrypt IN OUT --key HEX --nonce HEX [--chunk-size 4M] [--workers N]
+    python3 saturnin_file.py decrypt IN OUT --key HEX --nonce HEX
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from saturnin_aead import counter_blocks
+from saturnin_batch import saturnin_block_encrypt_batch
+
+DEFAULT_CHUNK = 4 << 20
+
+# ------------------- Worker -------------------
+
+# per-process state set up by _init_worker
+_job = {}
+
+def _init_worker(in_path: str, out_path: str, key: bytes, nonce: bytes, R: int, D: int):
+    fin = open(in_path, "rb")
+    fout = open(out_path, "r+b")
+    _job.update(
+        fin=fin, fout=fout,
+        src=mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ),
+        dst=mmap.mmap(fout.fileno(), 0, access=mmap.ACCESS_WRITE),
+        key=key, nonce=nonce, R=R, D=D,
+    )
+
+def _process_chunk(chunk):
+    """XOR keystream into output[offset:offset+length]; returns the length."""
+    offset, length = chunk
+    n_blocks = -(-length // 32)
+    ks = saturnin_block_encrypt_batch(
+        _job["R"], _job["D"], _job["key"],
+        counter_blocks(_job["nonce"], 1 + offset // 32, n_blocks),
+    ).reshape(-1)[:length]
+    src = np.frombuffer(_job["src"], dtype=np.uint8, count=length, offset=offset)
+    dst = np.frombuffer(_job["dst"], dtype=np.uint8, count=length, offset=offset)
+    np.bitwise_xor(src, ks, out=dst)
+    return length
+
+# ------------------- Driver -------------------
+
+def chunks(size: int, chunk_size: int):
+    """(offset, length) pairs covering 'size' bytes; chunk_size is rounded to whole blocks."""
+    chunk_size = max(32, chunk_size - chunk_size % 32)
+    return [(off, min(chunk_size, size - off)) for off in range(0, size, chunk_size)]
+
+def _report(done: int, total: int, t0: float):
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    pct = 100.0 * done / total if total else 100.0
+    rate = done / elapsed / (1 << 20)
+    sys.stderr.write(f"\r{done}/{total} bytes ({pct:5.1f}%)  {rate:7.2f} MiB/s")
+    sys.stderr.flush()
+
+def crypt_file(in_path: str, out_path: str, key: bytes, nonce: bytes,
+               R: int = 10, D: int = 1, chunk_size: int = DEFAULT_CHUNK,
+               workers: int = None, progress: bool = True):
+    """Encrypt (or, equivalently, decrypt) in_path into out_path."""
+    if len(key) != 32:
+        raise ValueError("key must be 32 bytes")
+    if len(nonce) != 16:
+        raise ValueError("nonce must be 16 bytes")
+    size = os.path.getsize(in_path)
+    if -(-size // 32) > 0xFFFFFFFF:
+        raise ValueError("file too large for a 32-bit block counter")
+
+    with open(out_path, "wb") as f:
+        f.truncate(size)
+    if size == 0:
+        return
+
+    work = chunks(size, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    init_args = (in_path, out_path, key, nonce, R, D)
+    done = 0
+    t0 = time.perf_counter()
+
+    if workers == 1:
+        _init_worker(*init_args)
+        results = map(_process_chunk, work)
+        for n in results:
+            done += n
+            if progress:
+                _report(done, size, t0)
+        for name in ("src", "dst", "fin", "fout"):
+            _job.pop(name).close()
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            for n in pool.imap_unordered(_process_chunk, work):
+                done += n
+                if progress:
+                    _report(done, size, t0)
+    if progress:
+        sys.stderr.write("\n")
+
+def parse_size(text: str) -> int:
+    """Parse sizes such as 65536, 64K, 4M or 1G."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Saturnin counter-mode file encryption")
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--key", required=True, help="256-bit key as 64 hex characters")
+    parser.add_argument("--nonce", required=True, help="128-bit nonce as 32 hex characters")
+    parser.add_argument("--rounds", type=int, default=10, help="super-rounds R (default 10)")
+    parser.add_argument("--domain", type=int, default=1, help="domain D (default 1)")
+    parser.add_argument("--chunk-size", type=parse_size, default=DEFAULT_CHUNK,
+                        help="bytes per work unit, e.g. 4M (default 4M)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    crypt_file(args.input, args.output, bytes.fromhex(args.key), bytes.fromhex(args.nonce),
+               R=args.rounds, D=args.domain, chunk_size=args.chunk_size,
+               workers=args.workers, progress=not args.quiet)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# saturnin_hash.py
+"""
+Saturnin-Hash: 256-bit hash built from the Saturnin block cipher with
+16 super-rounds, in Matyas-Meyer-Oseas mode. The chaining value h (all
+zeros at first) is the key that encrypts each 32-byte message block m:
+    h = E_h(m) ^ m
+Full blocks use domain 7. The input always ends with a padded block
+(remaining bytes, 0x80, zeros) under domain 8, so a message that is a
+multiple of 32 bytes gets one extra padding block.
+
+SaturninHash follows the hashlib interface (update / digest / hexdigest /
+copy). copy() snapshots the state, so a shared prefix is hashed only once.
+"""
+import numpy as np
+
+from saturnin import SaturninKey
+from saturnin_aead import pad, xor_bytes
+from saturnin_batch import saturnin_block_encrypt_batch
+
+R = 16
+D_BLOCK = 7
+D_LAST = 8
+
+DIGEST_SIZE = 32
+BLOCK_SIZE = 32
+
+# ------------------- Compression -------------------
+
+def compress(h: bytes, block) -> bytes:
+    """One compression step: E_h(block) ^ block."""
+    # h changes on every block, so build the key context directly
+    return xor_bytes(SaturninKey(h, R, D_BLOCK).encrypt(block), block)
+
+def compress_blocks(h: bytes, view: memoryview) -> bytes:
+    """Run the compression chain over every 32-byte block of 'view' (no copies)."""
+    for i in range(0, len(view), BLOCK_SIZE):
+        h = compress(h, view[i:i + BLOCK_SIZE])
+    return h
+
+# ------------------- Hash Object -------------------
+
+class SaturninHash:
+    name = "saturnin-hash"
+    digest_size = DIGEST_SIZE
+    block_size = BLOCK_SIZE
+
+    def __init__(self, data: bytes = b""):
+        self._h = bytes(DIGEST_SIZE)
+        self._buf = bytearray()
+        if data:
+            self.update(data)
+
+    def update(self, data: bytes):
+        view = memoryview(data).cast("B")
+        if self._buf:
+            take = min(BLOCK_SIZE - len(self._buf), len(view))
+            self._buf += view[:take]
+            view = view[take:]
+            if len(self._buf) < BLOCK_SIZE:
+                return
+            self._h = compress(self._h, self._buf)
+            self._buf = bytearray()
+        full = len(view) - len(view) % BLOCK_SIZE
+        self._h = compress_blocks(self._h, view[:full])
+        self._buf += view[full:]
+
+    def copy(self) -> "SaturninHash":
+        other = SaturninHash.__new__(SaturninHash)
+        other._h = self._h
+        other._buf = bytearray(self._buf)
+        return other
+
+    def digest(self) -> bytes:
+        last = pad(self._buf)
+        return xor_bytes(SaturninKey(self._h, R, D_LAST).encrypt(last), last)
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+def saturnin_hash(data: bytes) -> bytes:
+    return SaturninHash(data).digest()
+
+# ------------------- Many Messages -------------------
+
+def saturnin_hash_many(messages) -> list:
+    """
+    Hash many independent messages at once. Each compression step runs for
+    all messages together through the batch engine with one key per row,
+    so the per-block interpreter cost is shared across the batch.
+    """
+    messages = [bytes(m) for m in messages]
+    n = len(messages)
+    if n == 0:
+        return []
+    # every message ends with a padded block; full blocks come before it
+    n_blocks = [len(m) // BLOCK_SIZE + 1 for m in messages]
+    h = np.zeros((n, DIGEST_SIZE), dtype=np.uint8)
+    for step in range(max(n_blocks)):
+        rows = [i for i in range(n) if n_blocks[i] > step]
+        full = [i for i in rows if n_blocks[i] - 1 > step]
+        last = [i for i in rows if n_blocks[i] - 1 == step]
+        for idx, D in ((full, D_BLOCK), (last, D_LAST)):
+            if not idx:
+                continue
+            blocks = np.empty((len(idx), BLOCK_SIZE), dtype=np.uint8)
+            for j, i in enumerate(idx):
+                chunk = messages[i][step * BLOCK_SIZE:(step + 1) * BLOCK_SIZE]
+                if D == D_LAST:
+                    chunk = pad(chunk)
+                blocks[j] = np.frombuffer(chunk, dtype=np.uint8)
+            h[idx] = saturnin_block_encrypt_batch(R, D, h[idx], blocks) ^ blocks
+    return [row.tobytes() for row in h]
+
+# ------------------- Main -------------------
+if __name__ == "__main__":
+    import time
+
+    print("Saturnin-Hash('')    :", saturnin_hash(b"").hex())
+    print("Saturnin-Hash('abc') :", saturnin_hash(b"abc").hex())
+
+    prefix = SaturninHash(b"common prefix " * 64)
+    a, b = prefix.copy(), prefix.copy()
+    a.update(b"message A")
+    b.update(b"message B")
+    print("Prefix reuse ok      :",
+          a.digest() == saturnin_hash(b"common prefix " * 64 + b"message A"))
+
+    msgs = [bytes([i]) * (i * 7) for i in range(200)]
+    t0 = time.perf_counter()
+    single = [saturnin_hash(m) for m in msgs]
+    t1 = time.perf_counter()
+    many = saturnin_hash_many(msgs)
+    t2 = time.perf_counter()
+    print(f"200 messages: one by one {t1 - t0:.2f}s, batched {t2 - t1:.2f}s, equal: {single == many}")
@@ -0,0 +1,53 @@
+# saturnin_short.py
+"""
+Saturnin-Short: the single-block AEAD of the NIST API in encrypt.c.
+
+The 16-byte nonce and the plaintext (at most 15 bytes, padded with 0x80
+and zeros) fill one 32-byte block, which is encrypted with 10 super-rounds
+in domain 6. The ciphertext is always 32 bytes. Associated data is not
+supported. On decryption the first half must equal the nonce and the
+second half must be correctly padded.
+
+The block functions are parameters so that any backend can be plugged in.
+"""
+from typing import Callable
+
+from saturnin import saturnin_block_decrypt, saturnin_block_encrypt
+
+R = 10
+D = 6
+
+MAX_PT_BYTES = 15
+
+BlockFn = Callable[[int, int, bytes, bytes], bytes]
+
+def short_block(nonce: bytes, pt: bytes) -> bytes:
+    """nonce || pt || 0x80 || zeros, as encrypted by crypto_aead_encrypt."""
+    if len(nonce) != 16:
+        raise ValueError("nonce must be 16 bytes")
+    if len(pt) > MAX_PT_BYTES:
+        raise ValueError("Saturnin-Short plaintext is at most 15 bytes")
+    return bytes(nonce) + bytes(pt) + b"\x80" + b"\x00" * (MAX_PT_BYTES - len(pt))
+
+def short_open(nonce: bytes, block: bytes) -> bytes:
+    """Check the nonce and the padding of a decrypted block and return the plaintext."""
+    if block[:16] != bytes(nonce):
+        raise ValueError("authentication failed")
+    tail = block[16:].rstrip(b"\x00")
+    if not tail.endswith(b"\x80"):
+        raise ValueError("authentication failed")
+    return tail[:-1]
+
+def saturnin_short_encrypt(key: bytes, nonce: bytes, pt: bytes, ad: bytes = b"",
+                           block_encrypt: BlockFn = saturnin_block_encrypt) -> bytes:
+    if ad:
+        raise ValueError("Saturnin-Short does not support associated data")
+    return block_encrypt(R, D, key, short_block(nonce, pt))
+
+def saturnin_short_decrypt(key: bytes, nonce: bytes, ct: bytes, ad: bytes = b"",
+                           block_decrypt: BlockFn = saturnin_block_decrypt) -> bytes:
+    if ad:
+        raise ValueError("Saturnin-Short does not support associated data")
+    if len(ct) != 32:
+        raise ValueError("Saturnin-Short ciphertext is exactly 32 bytes")
+    return short_open(nonce, block_decrypt(R, D, key, ct))
@@ -0,0 +1,247 @@
+# saturnin_swar.py
+"""
+Single-block Saturnin on one packed Python integer (SIMD within a register).
+
+The 256-bit state is a single int made of four 64-bit registers. Register
+j (bits 64j .. 64j+63) holds words j, 4+j, 8+j and 12+j, one per 16-bit
+lane:
+
+    lane:      D (bits 48-63)  C (32-47)  B (16-31)  A (0-15)
+    reg 0:     x12             x8         x4         x0
+    reg 1:     x13             x9         x5         x1
+    reg 2:     x14             x10        x6         x2
+    reg 3:     x15             x11        x7         x3
+
+The S-box inputs a, b, c, d of every nibble group are registers 0..3, so
+each S-box step is one 64-bit operation for all four groups. In the
+linear layers a single bitwise operation acts on all four registers at
+once: MDS mixes lanes (shifts by 16) and registers (shifts by 64), and
+SR_slice / SR_sheet rotate every lane with one mask expression.
+
+The API matches saturnin.py: SwarKey plays the role of SaturninKey and
+saturnin_block_encrypt/decrypt have the same signatures.
+"""
+import struct
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Optional
+
+from saturnin import Tracer, make_round_constants
+
+REG = (1 << 64) - 1
+
+def _rep(m: int) -> int:
+    """Repeat a 64-bit mask in all four registers."""
+    return m | (m << 64) | (m << 128) | (m << 192)
+
+M_AC = 0x0000FFFF0000FFFF   # lanes A and C of one register
+M_BD = 0xFFFF0000FFFF0000   # lanes B and D of one register
+AC = _rep(M_AC)             # sigma_0 groups, MDS words 0-3 and 8-11
+BD = _rep(M_BD)             # sigma_1 groups, MDS words 4-7 and 12-15
+LANE_B = _rep(0x00000000FFFF0000)
+LANE_D = _rep(0xFFFF000000000000)
+LOW2 = (1 << 128) - 1       # registers 0 and 1
+
+# ------------------- Packing -------------------
+
+_WORDS = struct.Struct("<16H")
+# word order inside the packed integer: position 4j+g holds word 4g+j
+_TRANSPOSE = itemgetter(*[4*g + j for j in range(4) for g in range(4)])
+
+def pack(buf: bytes) -> int:
+    return int.from_bytes(_WORDS.pack(*_TRANSPOSE(_WORDS.unpack(buf[:32]))), "little")
+
+def unpack(x: int) -> bytes:
+    # the transposition is its own inverse
+    return _WORDS.pack(*_TRANSPOSE(_WORDS.unpack(x.to_bytes(32, "little"))))
+
+def unpack_words(x: int) -> List[int]:
+    return list(_TRANSPOSE(_WORDS.unpack(x.to_bytes(32, "little"))))
+
+# ------------------- S-box -------------------
+
+def S_box(x: int) -> int:
+    a = x & REG; b = (x >> 64) & REG; c = (x >> 128) & REG; d = x >> 192
+    a ^= b & c; b ^= a | d; d ^= b | c; c ^= b & d; b ^= a | c; a ^= b | d
+    # sigma_0 lanes output (b,c,d,a), sigma_1 lanes output (d,b,a,c)
+    return (((b & M_AC) | (d & M_BD)) | (((c & M_AC) | (b & M_BD)) << 64)
+            | (((d & M_AC) | (a & M_BD)) << 128) | (((a & M_AC) | (c & M_BD)) << 192))
+
+def S_box_inv(x: int) -> int:
+    r0 = x & REG; r1 = (x >> 64) & REG; r2 = (x >> 128) & REG; r3 = x >> 192
+    a = (r3 & M_AC) | (r2 & M_BD)
+    b = (r0 & M_AC) | (r1 & M_BD)
+    c = (r1 & M_AC) | (r3 & M_BD)
+    d = (r2 & M_AC) | (r0 & M_BD)
+    a ^= b | d; b ^= a | c; c ^= b & d; d ^= b | c; b ^= a | d; a ^= b & c
+    return a | (b << 64) | (c << 128) | (d << 192)
+
+# ------------------- MDS -------------------
+# Within a register "A ^= B; C ^= D" is x ^= (x >> 16) & AC and
+# "B ^= C; D ^= A" is x ^= ((x >> 16) & LANE_B) | ((x << 48) & LANE_D).
+# MUL and its powers move whole registers (shifts by 64) in the lanes of
+# one mask; x ^= (x ^ y) & m takes y in those lanes and keeps x elsewhere.
+
+def MDS(x: int) -> int:
+    x ^= (x >> 16) & AC
+    # B, D = MUL: registers (t0,t1,t2,t3) -> (t1,t2,t3,t0^t1)
+    y = (x >> 64) | (((x ^ (x >> 64)) & REG) << 192)
+    x ^= (x ^ y) & BD
+    x ^= ((x >> 16) & LANE_B) | ((x << 48) & LANE_D)
+    # A, C = MUL^2: (t0,t1,t2,t3) -> (t2,t3,t0^t1,t1^t2)
+    y = (x >> 128) | (((x ^ (x >> 64)) & LOW2) << 128)
+    x ^= (x ^ y) & AC
+    x ^= (x >> 16) & AC
+    x ^= ((x >> 16) & LANE_B) | ((x << 48) & LANE_D)
+    return x
+
+def MDS_inv(x: int) -> int:
+    x ^= ((x >> 16) & LANE_B) | ((x << 48) & LANE_D)
+    x ^= (x >> 16) & AC
+    # A, C = MULinv^2: (t0,t1,t2,t3) -> (t0^t2^t3, t0^t3, t0, t1)
+    z = (x ^ (x >> 192)) & REG
+    y = (x << 128) | ((z ^ (x >> 128)) & REG) | (z << 64)
+    x ^= (x ^ y) & AC
+    x ^= ((x >> 16) & LANE_B) | ((x << 48) & LANE_D)
+    # B, D = MULinv: (t0,t1,t2,t3) -> (t3^t0, t0, t1, t2)
+    y = (x << 64) | ((x ^ (x >> 192)) & REG)
+    x ^= (x ^ y) & BD
+    x ^= (x >> 16) & AC
+    return x
+
+# ------------------- SR permutations -------------------
+# Lane A is fixed and lanes B, C, D rotate by different amounts: one
+# (keep-low, keep-high) mask pair per lane, repeated in every register.
+
+def _lane_masks(low_b: int, low_c: int, low_d: int):
+    return (_rep(0xFFFF), _rep(low_b << 16), _rep((~low_b & 0xFFFF) << 16),
+            _rep(low_c << 32), _rep((~low_c & 0xFFFF) << 32),
+            _rep(low_d << 48), _rep((~low_d & 0xFFFF) << 48))
+
+# nibbles of lane B/C/D rotate left by 1/2/3 bits (SR_slice) and back
+_SL_A, _SL_BL, _SL_BH, _SL_CL, _SL_CH, _SL_DL, _SL_DH = _lane_masks(0x7777, 0x3333, 0x1111)
+_SLI_A, _SLI_BL, _SLI_BH, _SLI_CL, _SLI_CH, _SLI_DL, _SLI_DH = _lane_masks(0x1111, 0x3333, 0x7777)
+# lane B/C/D rotates left by 4/8/12 bits (SR_sheet) and back
+_SH_A, _SH_BL, _SH_BH, _SH_CL, _SH_CH, _SH_DL, _SH_DH = _lane_masks(0x0FFF, 0x00FF, 0x000F)
+_SHI_A, _SHI_BL, _SHI_BH, _SHI_CL, _SHI_CH, _SHI_DL, _SHI_DH = _lane_masks(0x000F, 0x00FF, 0x0FFF)
+
+def SR_slice(x: int) -> int:
+    return ((x & _SL_A) | ((x & _SL_BL) << 1) | ((x & _SL_BH) >> 3) | ((x & _SL_CL) << 2)
+            | ((x & _SL_CH) >> 2) | ((x & _SL_DL) << 3) | ((x & _SL_DH) >> 1))
+
+def SR_slice_inv(x: int) -> int:
+    return ((x & _SLI_A) | ((x & _SLI_BL) << 3) | ((x & _SLI_BH) >> 1) | ((x & _SLI_CL) << 2)
+            | ((x & _SLI_CH) >> 2) | ((x & _SLI_DL) << 1) | ((x & _SLI_DH) >> 3))
+
+def SR_sheet(x: int) -> int:
+    return ((x & _SH_A) | ((x & _SH_BL) << 4) | ((x & _SH_BH) >> 12) | ((x & _SH_CL) << 8)
+            | ((x & _SH_CH) >> 8) | ((x & _SH_DL) << 12) | ((x & _SH_DH) >> 4))
+
+def SR_sheet_inv(x: int) -> int:
+    return ((x & _SHI_A) | ((x & _SHI_BL) << 12) | ((x & _SHI_BH) >> 4) | ((x & _SHI_CL) << 8)
+            | ((x & _SHI_CH) >> 8) | ((x & _SHI_DL) << 4) | ((x & _SHI_DH) >> 12))
+
+# ------------------- Key Schedule -------------------
+
+class SwarKey:
+    """
+    Packed key context for one (key, R, D). The round constants (RC0 into
+    word 0, RC1 into word 8: lanes A and C of register 0) are merged into
+    each round key, so a round ends with a single XOR.
+    """
+
+    def __init__(self, key_bytes: bytes, R: int, D: int):
+        self.R = R
+        self.D = D
+        RC0, RC1 = make_round_constants(R, D)
+        self.xk = pack(key_bytes)
+        # rotating every 16-bit word left by 11 is one per-lane rotation
+        low = _rep(0x001F001F001F001F)
+        self.xk_rot = ((self.xk & low) << 11) | ((self.xk & ~low) >> 5)
+        self.schedule = [
+            (i, (self.xk_rot if (i & 1) == 0 else self.xk) ^ RC0[i] ^ (RC1[i] << 32))
+            for i in range(R)
+        ]
+        self.inv_schedule = self.schedule[::-1]
+
+    def encrypt(self, buf: bytes, tracer: Optional[Tracer] = None) -> bytes:
+        x = pack(buf) ^ self.xk
+
+        for i, rk in self.schedule:
+            # Even round
+            x = MDS(S_box(x))
+            if tracer is not None:
+                tracer(unpack_words(x), "Encrypt", i, "Even")
+
+            # Odd round
+            x = S_box(x)
+            if (i & 1) == 0:
+                x = SR_slice_inv(MDS(SR_slice(x))) ^ rk
+                if tracer is not None:
+                    tracer(unpack_words(x), "Encrypt", i, "Odd Slice")
+            else:
+                x = SR_sheet_inv(MDS(SR_sheet(x))) ^ rk
+                if tracer is not None:
+                    tracer(unpack_words(x), "Encrypt", i, "Odd Sheet")
+
+        return unpack(x)
+
+    def decrypt(self, buf: bytes, tracer: Optional[Tracer] = None) -> bytes:
+        x = pack(buf)
+
+        for i, rk in self.inv_schedule:
+            # Odd round
+            x ^= rk
+            if (i & 1) == 0:
+                x = S_box_inv(SR_slice_inv(MDS_inv(SR_slice(x))))
+                if tracer is not None:
+                    tracer(unpack_words(x), "Decrypt", i, "Odd Slice")
+            else:
+                x = S_box_inv(SR_sheet_inv(MDS_inv(SR_sheet(x))))
+                if tracer is not None:
+                    tracer(unpack_words(x), "Decrypt", i, "Odd Sheet")
+
+            # Even round
+            x = S_box_inv(MDS_inv(x))
+            if tracer is not None:
+                tracer(unpack_words(x), "Decrypt", i, "Even")
+
+        return unpack(x ^ self.xk)
+
+@lru_cache(maxsize=1024)
+def swar_key(key_bytes: bytes, R: int, D: int) -> SwarKey:
+    """Cached SwarKey, like saturnin.saturnin_key."""
+    return SwarKey(key_bytes, R, D)
+
+# ------------------- Block Encrypt / Decrypt -------------------
+
+def saturnin_block_encrypt(R: int, D: int, key_bytes: bytes, buf: bytes,
+                           tracer: Optional[Tracer] = None) -> bytes:
+    return swar_key(bytes(key_bytes[:32]), R, D).encrypt(buf, tracer)
+
+def saturnin_block_decrypt(R: int, D: int, key_bytes: bytes, buf: bytes,
+                           tracer: Optional[Tracer] = None) -> bytes:
+    return swar_key(bytes(key_bytes[:32]), R, D).decrypt(buf, tracer)
+
+# ------------------- Main -------------------
+if __name__ == "__main__":
+    import time
+
+    import saturnin
+
+    R, D = 10, 6
+    KEY = bytes(range(32))
+    BLOCK = bytes(range(16)) + b"\x80" + b"\x00" * 15
+
+    ct = saturnin_block_encrypt(R, D, KEY, BLOCK)
+    print("Ciphertext  :", ct.hex())
+    print("Expected CT : ef142fc810ce92839726d600fccfd7119050da25a3ec5586c7c43ca668e3c8c0")
+    print("Round trip ok:", saturnin_block_decrypt(R, D, KEY, ct) == BLOCK)
+
+    N = 5000
+    for name, fn in (("list", saturnin.saturnin_block_encrypt), ("swar", saturnin_block_encrypt)):
+        t0 = time.perf_counter()
+        for _ in range(N):
+            fn(R, D, KEY, BLOCK)
+        dt = time.perf_counter() - t0
+        print(f"{name}: {dt / N * 1e6:7.1f} us/block")
@@ -0,0 +1,74 @@
+# tracing.py
+"""
+Round tracers for saturnin.py and saturnin_batch.py.
+
+Encryption and decryption take an optional tracer, called as
+tracer(state, label, round_num, phase) after every half-round. With no
+tracer nothing is formatted or stored. print_state (in saturnin.py) prints
+the state as before; the tracers below capture it for later analysis.
+
+Phases are numbered 0 for the even half-round and 1 for the odd one
+("Odd Slice" or "Odd Sheet", depending on the round).
+"""
+from typing import BinaryIO, List, Optional, Union
+
+import numpy as np
+
+State = Union[List[int], np.ndarray]
+
+# One binary trace record: round, phase and the 16 state words.
+RECORD = np.dtype([("round", "u1"), ("phase", "u1"), ("words", "<u2", (16,))])
+
+def phase_index(phase: str) -> int:
+    return 0 if phase == "Even" else 1
+
+# ------------------- Array capture -------------------
+
+class ArrayTracer:
+    """
+    Store every traced state in a preallocated uint16 array of shape
+    (R, 2, 16) for one block, or (R, 2, 16, N) for a batch of N blocks.
+    Each call overwrites its (round, phase) slot, so reusing a tracer
+    keeps the states of the most recent encryption.
+    """
+
+    def __init__(self, R: int, n_blocks: Optional[int] = None):
+        shape = (R, 2, 16) if n_blocks is None else (R, 2, 16, n_blocks)
+        self.states = np.zeros(shape, dtype=np.uint16)
+
+    def __call__(self, state: State, label: str, round_num: int, phase: str):
+        self.states[round_num, phase_index(phase)] = state
+
+# ------------------- Binary stream -------------------
+
+class FileTracer:
+    """
+    Append every traced state to a binary file as RECORD entries (34 bytes
+    each); a batch state of N blocks writes N records. Read the file back
+    with read_trace(). Use as a context manager, or call close().
+    """
+
+    def __init__(self, path: str):
+        self.f: BinaryIO = open(path, "wb")
+
+    def __call__(self, state: State, label: str, round_num: int, phase: str):
+        words = np.asarray(state, dtype=np.uint16)
+        n = 1 if words.ndim == 1 else words.shape[1]
+        rec = np.empty(n, dtype=RECORD)
+        rec["round"] = round_num
+        rec["phase"] = phase_index(phase)
+        rec["words"] = words.reshape(16, n).T
+        self.f.write(rec.tobytes())
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_trace(path: str) -> np.ndarray:
+    """Load a FileTracer file as a structured array of RECORD entries."""
+    return np.fromfile(path, dtype=RECORD)
@@ -0,0 +1,365 @@
+# gf2_linear.py
+"""
+Binary matrices of the linear layers of Saturnin and of the toy cipher.
+
+Every linear layer f is compiled into an n x n matrix over GF(2) by
+probing it with the basis vectors: f(e_j) is column j. The matrix is kept
+as packed-integer rows (rows[i] has bit j set when input bit j feeds
+output bit i) and, for evaluation, as byte tables: the XOR of the columns
+selected by each input byte, so a matrix-vector product is one lookup per
+byte of the input.
+
+States are packed into one integer:
+  * Saturnin: 16 words, bit b of word i at position 16*i + b, which is
+    int.from_bytes(block, "little") for a 32-byte block;
+  * toy: 8 nibbles, bit b of nibble i at position 4*(7 - i) + b, the
+    packing used by toy_table.py / toy_batch.py (nibble 0 most significant).
+
+For a linear layer y = M x, differences propagate through M, and a mask
+alpha on x is carried to the mask beta = M^-T alpha on y (alpha . x =
+beta . y); backwards, beta gives alpha = M^T beta. LinearLayer holds all
+four matrices.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Add parent directory to path to import toy, and implementation/ for saturnin
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'implementation'))
+
+from toy import toy
+import saturnin
+
+# ------------------- Bit matrices -------------------
+
+class BitMatrix:
+    """Square matrix over GF(2) with packed-integer rows."""
+
+    def __init__(self, rows: Sequence[int]):
+        self.rows = list(rows)
+        self.n = len(self.rows)
+        self._tables = None
+
+    @classmethod
+    def from_columns(cls, columns: Sequence[int]) -> "BitMatrix":
+        n = len(columns)
+        rows = [0] * n
+        for j, col in enumerate(columns):
+            while col:
+                low = col & -col
+                rows[low.bit_length() - 1] |= 1 << j
+                col ^= low
+        return cls(rows)
+
+    @classmethod
+    def identity(cls, n: int) -> "BitMatrix":
+        return cls([1 << i for i in range(n)])
+
+    @property
+    def columns(self) -> List[int]:
+        return self.transpose().rows
+
+    def byte_tables(self) -> List[List[int]]:
+        if self._tables is None:
+            columns = self.columns + [0] * (-self.n % 8)
+            self._tables = []
+            for k in range(0, len(columns), 8):
+                t = [0] * 256
+                for v in range(1, 256):
+                    low = (v & -v).bit_length() - 1
+                    t[v] = t[v & (v - 1)] ^ columns[k + low]
+                self._tables.append(t)
+        return self._tables
+
+    def apply(self, x: int) -> int:
+        """M x for a packed n-bit vector x."""
+        out = 0
+        for t in self.byte_tables():
+            out ^= t[x & 0xFF]
+            x >>= 8
+        return out
+
+    __call__ = apply
+
+    def __matmul__(self, other: "BitMatrix") -> "BitMatrix":
+        """Composition: (self @ other) x = self(other(x))."""
+        return BitMatrix.from_columns([self.apply(c) for c in other.columns])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BitMatrix) and self.rows == other.rows
+
+    def transpose(self) -> "BitMatrix":
+        return BitMatrix.from_columns(self.rows)
+
+    def rank(self) -> int:
+        return len(_echelon(list(self.rows)))
+
+    def inverse(self) -> "BitMatrix":
+        """Gauss-Jordan elimination on [M | I]; ValueError if M is singular."""
+        n = self.n
+        aug = [row | (1 << (n + i)) for i, row in enumerate(self.rows)]
+        for col in range(n):
+            pivot = next((r for r in range(col, n) if (aug[r] >> col) & 1), None)
+            if pivot is None:
+                raise ValueError("matrix is singular")
+            aug[col], aug[pivot] = aug[pivot], aug[col]
+            for r in range(n):
+                if r != col and (aug[r] >> col) & 1:
+                    aug[r] ^= aug[col]
+        return BitMatrix([row >> n for row in aug])
+
+    def weight(self) -> int:
+        """Number of ones (XOR count of the naive implementation + n)."""
+        return sum(bin(row).count("1") for row in self.rows)
+
+    def to_lists(self) -> List[List[int]]:
+        return [[(row >> j) & 1 for j in range(self.n)] for row in self.rows]
+
+def _echelon(rows: List[int]) -> List[int]:
+    basis = []
+    for row in rows:
+        for b in basis:
+            row = min(row, row ^ b)
+        if row:
+            basis.append(row)
+            basis.sort(reverse=True)
+    return basis
+
+# ------------------- Compilation -------------------
+
+def compile_matrix(f: Callable[[int], int], n: int, trials: int = 64) -> BitMatrix:
+    """
+    Matrix of a linear map f on n-bit ints, from f(e_j) for every j. The
+    result is checked on 'trials' random inputs; ValueError if f is not
+    linear (e.g. it adds a constant).
+    """
+    if f(0) != 0:
+        raise ValueError("f(0) != 0, not a linear map")
+    matrix = BitMatrix.from_columns([f(1 << j) for j in range(n)])
+    rng = random.Random(n)
+    for _ in range(trials):
+        x = rng.getrandbits(n)
+        if matrix.apply(x) != f(x):
+            raise ValueError(f"f is not linear: f({x:#x}) differs from its matrix")
+    return matrix
+
+def cell_matrix(matrix: BitMatrix, cells: int, width: int,
+                position: Callable[[int, int], int]) -> Optional[List[List[int]]]:
+    """
+    If the matrix is A (x) I_width on 'cells' cells of 'width' bits, i.e.
+    bit b of output cell i is the XOR of bit b of the input cells j with
+    A[i][j] = 1, return A as 0/1 lists; otherwise None. position(i, b) is
+    the packed position of bit b of cell i.
+    """
+    A = [[(matrix.rows[position(i, 0)] >> position(j, 0)) & 1 for j in range(cells)]
+         for i in range(cells)]
+    for i in range(cells):
+        for b in range(width):
+            row = 0
+            for j in range(cells):
+                if A[i][j]:
+                    row |= 1 << position(j, b)
+            if matrix.rows[position(i, b)] != row:
+                return None
+    return A
+
+# ------------------- Layers -------------------
+
+class LinearLayer:
+    """
+    A compiled linear layer: 'matrix' for differences, 'inv' for the
+    inverse layer, 'mask' carries an input mask to the output mask and
+    'mask_inv' an output mask back to the input mask.
+    """
+
+    def __init__(self, name: str, matrix: BitMatrix):
+        self.name = name
+        self.matrix = matrix
+        self.inv = matrix.inverse()
+        self.mask = self.inv.transpose()
+        self.mask_inv = matrix.transpose()
+
+    def difference(self, d: int) -> int:
+        return self.matrix.apply(d)
+
+    def difference_inv(self, d: int) -> int:
+        return self.inv.apply(d)
+
+    def propagate_mask(self, alpha: int) -> int:
+        return self.mask.apply(alpha)
+
+    def propagate_mask_inv(self, beta: int) -> int:
+        return self.mask_inv.apply(beta)
+
+# toy: 8 nibbles, nibble 0 most significant
+
+TOY_BITS = 32
+
+def toy_pos(i: int, b: int) -> int:
+    return 4*(7 - i) + b
+
+def toy_to_int(state: Sequence[int]) -> int:
+    v = 0
+    for n in state:
+        v = (v << 4) | (n & 0xF)
+    return v
+
+def toy_from_int(v: int) -> List[int]:
+    return [(v >> (28 - 4*i)) & 0xF for i in range(8)]
+
+def _toy(f):
+    return lambda v: toy_to_int(f(toy_from_int(v)))
+
+TOY_FUNCTIONS: Dict[str, Callable[[List[int]], List[int]]] = {
+    "mds": toy.mds,
+    "inv_mds": toy.inv_mds,
+    "SR_slice": toy.SR_slice,
+    "inv_SR_slice": toy.inv_SR_slice,
+    "SR_sheet": toy.SR_sheet,
+    "inv_SR_sheet": toy.inv_SR_sheet,
+    # linear layer of the odd half-round
+    "odd_slice": lambda s: toy.inv_SR_slice(toy.mds(toy.SR_slice(s))),
+    "odd_sheet": lambda s: toy.inv_SR_sheet(toy.mds(toy.SR_sheet(s))),
+}
+
+# Saturnin: 16 words, word i in bits 16i .. 16i+15
+
+SATURNIN_BITS = 256
+
+def saturnin_pos(i: int, b: int) -> int:
+    return 16*i + b
+
+def saturnin_to_int(state: Sequence[int]) -> int:
+    return int.from_bytes(saturnin.from_words(state), "little")
+
+def saturnin_from_int(v: int) -> List[int]:
+    return saturnin.to_words(v.to_bytes(32, "little"))
+
+def _in_place(f):
+    def g(state):
+        state = list(state)
+        f(state)
+        return state
+    return g
+
+def _saturnin(f):
+    return lambda v: saturnin_to_int(f(saturnin_from_int(v)))
+
+SATURNIN_FUNCTIONS: Dict[str, Callable[[List[int]], List[int]]] = {
+    "MDS": _in_place(saturnin.MDS),
+    "MDS_inv": _in_place(saturnin.MDS_inv),
+    "SR_slice": _in_place(saturnin.SR_slice),
+    "SR_slice_inv": _in_place(saturnin.SR_slice_inv),
+    "SR_sheet": _in_place(saturnin.SR_sheet),
+    "SR_sheet_inv": _in_place(saturnin.SR_sheet_inv),
+    "odd_slice": _in_place(lambda s: (saturnin.SR_slice(s), saturnin.MDS(s), saturnin.SR_slice_inv(s))),
+    "odd_sheet": _in_place(lambda s: (saturnin.SR_sheet(s), saturnin.MDS(s), saturnin.SR_sheet_inv(s))),
+}
+
+CIPHERS = {
+    "toy": (TOY_FUNCTIONS, _toy, TOY_BITS),
+    "saturnin": (SATURNIN_FUNCTIONS, _saturnin, SATURNIN_BITS),
+}
+
+@lru_cache(maxsize=None)
+def layer(cipher: str, name: str) -> LinearLayer:
+    """Compiled linear layer, e.g. layer("toy", "mds") or layer("saturnin", "odd_sheet")."""
+    functions, wrap, n = CIPHERS[cipher]
+    return LinearLayer(name, compile_matrix(wrap(functions[name]), n))
+
+def toy_layer(name: str) -> LinearLayer:
+    return layer("toy", name)
+
+def saturnin_layer(name: str) -> LinearLayer:
+    return layer("saturnin", name)
+
+# ------------------- Checks -------------------
+
+# layer -> its inverse among the compiled functions
+INVERSES = {
+    "toy": {"mds": "inv_mds", "SR_slice": "inv_SR_slice", "SR_sheet": "inv_SR_sheet"},
+    "saturnin": {"MDS": "MDS_inv", "SR_slice": "SR_slice_inv", "SR_sheet": "SR_sheet_inv"},
+}
+
+def read_mzn_matrix(path: str) -> List[List[int]]:
+    """The hand-written 8x8 matrix M of mzn/saturnin.mzn."""
+    with open(path) as f:
+        text = f.read()
+    body = re.search(r"array2d\(0\.\.7,\s*0\.\.7,\s*\[(.*?)\]", text, re.S).group(1)
+    values = [int(v) for v in re.findall(r"\d", body)]
+    return [values[8*i:8*i + 8] for i in range(8)]
+
+def verify(mzn_path: str = os.path.join(ROOT, "mzn", "saturnin.mzn")) -> bool:
+    ok = True
+    for cipher, pairs in INVERSES.items():
+        for name, inv_name in pairs.items():
+            L = layer(cipher, name)
+            match = L.inv == layer(cipher, inv_name).matrix
+            ok &= match
+            print(f"{cipher:9s} {name:9s} rank {L.matrix.rank():3d}  inverse matches {inv_name}: {match}")
+    if os.path.exists(mzn_path):
+        M = cell_matrix(toy_layer("mds").matrix, 8, 4, toy_pos)
+        match = M == read_mzn_matrix(mzn_path)
+        ok &= match
+        print(f"toy mds = M (x) I4 with M as in {os.path.relpath(mzn_path, ROOT)}: {match}")
+    return ok
+
+# ------------------- Storage -------------------
+
+def dump(path: str, ciphers: Sequence[str] = tuple(CIPHERS)):
+    """Write every compiled matrix as hex packed rows to a JSON file."""
+    out = {}
+    for cipher in ciphers:
+        functions, _, n = CIPHERS[cipher]
+        out[cipher] = {"bits": n, "layers": {
+            name: [f"{row:x}" for row in layer(cipher, name).matrix.rows] for name in functions}}
+    with open(path, "w") as f:
+        json.dump(out, f, indent=1)
+
+def load(path: str) -> Dict[str, Dict[str, BitMatrix]]:
+    """Read a dump() file back as {cipher: {layer: BitMatrix}}."""
+    with open(path) as f:
+        data = json.load(f)
+    return {cipher: {name: BitMatrix([int(r, 16) for r in rows])
+                     for name, rows in entry["layers"].items()}
+            for cipher, entry in data.items()}
+
+# ------------------- Main -------------------
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="GF(2) matrices of the Saturnin / toy linear layers")
+    parser.add_argument("command", choices=["verify", "show", "dump"])
+    parser.add_argument("--cipher", choices=list(CIPHERS), default="toy")
+    parser.add_argument("--layer", default="mds", help="layer name for 'show'")
+    parser.add_argument("--output", default="linear_layers.json", help="JSON file for 'dump'")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        sys.exit(0 if verify() else 1)
+    elif args.command == "show":
+        L = layer(args.cipher, args.layer)
+        width, cells, pos = (4, 8, toy_pos) if args.cipher == "toy" else (16, 16, saturnin_pos)
+        A = cell_matrix(L.matrix, cells, width, pos)
+        print(f"{args.cipher} {args.layer}: {L.matrix.n}x{L.matrix.n}, rank {L.matrix.rank()}, "
+              f"{L.matrix.weight()} ones")
+        if A is not None:
+            print(f"= A (x) I{width} with A =")
+            for row in A:
+                print(" ", " ".join(map(str, row)))
+        else:
+            digits = L.matrix.n // 4
+            for i, row in enumerate(L.matrix.rows):
+                print(f"  row {i:3d}: {row:0{digits}x}")
+    else:
+        dump(args.output)
+        print(args.output)
+
+if __name__ == "__main__":
+    main()
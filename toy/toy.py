@@ -1,3 +1,10 @@
+# toy.py
+"""
+Toy Saturnin: 8 nibbles (32-bit block, 32-bit key), converted from
+toy.ipynb. Importing the module only defines the cipher; the notebook's
+demo cells are the demo_* functions, run with `python3 toy.py`.
+"""
+import random
 
 
 def sbox_kriti(state):
@@ -49,12 +56,13 @@ def sbox_inv_kriti(state):
 # In[2]:
 
 
-state = [1,0,0,0,0,0,0,0]
-print("Input state:     ", [(x) for x in state])
-state_sboxed = sbox_kriti(state)
-print("After S-box:     ", [(x) for x in state_sboxed])
-state_sboxed_inv = sbox_inv_kriti(state_sboxed)
-print("After S-box inv: ", [(x) for x in state_sboxed_inv])
+def demo_sbox():
+    state = [1,0,0,0,0,0,0,0]
+    print("Input state:     ", [(x) for x in state])
+    state_sboxed = sbox_kriti(state)
+    print("After S-box:     ", [(x) for x in state_sboxed])
+    state_sboxed_inv = sbox_inv_kriti(state_sboxed)
+    print("After S-box inv: ", [(x) for x in state_sboxed_inv])
 
 
 # ## Making round constants (same as original implementation)
@@ -229,12 +237,13 @@ def inv_SR_sheet(state):
 # In[7]:
 
 
-state = [1,2,3,4,5,6,7,8]
-print("Input State:     ", [(x) for x in state])
-state_sr = SR_sheet(state)
-print("After SR sheet:  ", [(x) for x in state_sr])
-state_inv_sr = inv_SR_sheet(state_sr)
-print("After inv SR:    ", [(x) for x in state_inv_sr])
+def demo_sr():
+    state = [1,2,3,4,5,6,7,8]
+    print("Input State:     ", [(x) for x in state])
+    state_sr = SR_sheet(state)
+    print("After SR sheet:  ", [(x) for x in state_sr])
+    state_inv_sr = inv_SR_sheet(state_sr)
+    print("After inv SR:    ", [(x) for x in state_inv_sr])
 
 
 # ## Trying to implement mds here and checking if its coming to be an involution or not
@@ -341,29 +350,28 @@ def inv_mds(state):
 # In[23]:
 
 
-# Random 8-nibble state
-state = [1,2,3,4,5,6,7,8]
+def demo_mds():
+    # Random 8-nibble state
+    state = [1,2,3,4,5,6,7,8]
 
-state = [0,0,0,0,0,0,0,1]
-state = [0,1,0,0,0,0,0,0]
-state = [0,0,0,1,0,0,0,0]
-state = [1,0,0,0,0,0,0,0]
-print("Original:", state)
+    state = [0,0,0,0,0,0,0,1]
+    state = [0,1,0,0,0,0,0,0]
+    state = [0,0,0,1,0,0,0,0]
+    state = [1,0,0,0,0,0,0,0]
+    print("Original:", state)
 
-fwd = mds(state)
-print("After MDS:", fwd)
+    fwd = mds(state)
+    print("After MDS:", fwd)
 
-inv = inv_mds(fwd)
-print("After inverse:", inv)
+    inv = inv_mds(fwd)
+    print("After inverse:", inv)
 
-print("Correct:", inv == state)
+    print("Correct:", inv == state)
 
 
 # In[10]:
 
 
-import random
-
 def average_diffusion(mds_func, trials=100):
     n = 8  # number of nibbles
     total_flipped = 0
@@ -385,8 +393,9 @@ def average_diffusion(mds_func, trials=100):
     return avg_diffusion
 
 
-avg = average_diffusion(mds, trials=100)
-print(f"Average diffusion: {avg:.2f} output nibbles changed per input bit flip")
+def demo_diffusion(trials=100):
+    avg = average_diffusion(mds, trials=trials)
+    print(f"Average diffusion: {avg:.2f} output nibbles changed per input bit flip")
 
 
 # ## Encryption and decryption functions
@@ -493,3 +502,16 @@ def decrypt_toy_debug(plaintext, key, R=1):
     state = xor_key(key, state)
 
     return state
+
+
+# ## Demos
+
+def run_demos():
+    demo_sbox()
+    demo_sr()
+    demo_mds()
+    demo_diffusion()
+
+
+if __name__ == "__main__":
+    run_demos()
@@ -0,0 +1,215 @@
+# toy_batch.py
+"""
+Vectorised toy cipher: encrypt_toy_debug / decrypt_toy_debug for many
+states at once.
+
+The states of N blocks are held as an (8, N) uint8 array, row i being
+nibble i of every block, and every layer of toy.py (sbox_kriti, mds,
+SR_slice / SR_sheet, round constants, xor_key / xor_key_rotated) is a few
+whole-array operations on those rows.
+
+Blocks can be given as an (N, 8) array of nibbles or as a uint32 array of
+N packed blocks (nibble 0 most significant, as in toy_table.py); results
+come back in the same form. The key is one key (a 32-bit int, or a
+list / tuple of 8 nibbles) or one key per block (an array of N packed
+keys, or an (N, 8) array of nibbles).
+"""
+from typing import Sequence, Union
+
+import numpy as np
+
+try:
+    from . import toy as ref            # imported as toy.toy_batch
+except ImportError:
+    import toy as ref                   # run from inside toy/
+
+Blocks = np.ndarray
+Key = Union[int, Sequence[int], np.ndarray]
+
+# ------------------- Conversion -------------------
+
+def to_state(blocks: Blocks) -> np.ndarray:
+    """(N, 8) nibbles or (N,) packed uint32 -> (8, N) uint8 state (a copy)."""
+    blocks = np.asarray(blocks)
+    if blocks.ndim == 1:
+        v = blocks.astype(np.uint32)
+        shifts = np.arange(28, -1, -4, dtype=np.uint32)[:, None]
+        return ((v[None, :] >> shifts) & 0xF).astype(np.uint8)
+    if blocks.ndim != 2 or blocks.shape[1] != 8:
+        raise ValueError("expected an (N, 8) array of nibbles or an (N,) uint32 array")
+    return np.array(blocks.T & 0xF, dtype=np.uint8, order="C")
+
+def from_state(state: np.ndarray, packed: bool) -> np.ndarray:
+    """(8, N) state -> (N,) uint32 if packed, else (N, 8) uint8 nibbles."""
+    if not packed:
+        return np.ascontiguousarray(state.T)
+    v = np.zeros(state.shape[1], dtype=np.uint32)
+    for row in state:
+        v = (v << 4) | row
+    return v
+
+def key_state(key: Key, n: int) -> np.ndarray:
+    """
+    Key as an (8, 1) column (one key for all blocks) or an (8, n) array
+    (one key per block). The layout follows the type and shape only:
+
+        int, or list / tuple of 8 nibbles   -> one key
+        (n,) array of packed 32-bit keys    -> one key per block
+        (n, 8) array of nibbles             -> one key per block
+    """
+    if isinstance(key, (int, np.integer)):
+        return to_state(np.array([key], dtype=np.uint32))
+    if isinstance(key, (list, tuple)):
+        if len(key) != 8:
+            raise ValueError("a list key is the 8 nibbles of one key; "
+                             "pass per-block keys as an array")
+        return np.array(key, dtype=np.uint8).reshape(8, 1) & 0xF
+    key = np.asarray(key)
+    if key.dtype.kind not in "iu":
+        raise TypeError(f"expected integer keys, got {key.dtype}")
+    if key.ndim == 0:
+        return to_state(key.astype(np.uint32).reshape(1))
+    if key.ndim == 1:
+        if key.size and (key.min() < 0 or int(key.max()) >> 32):
+            raise ValueError("packed keys must be 32-bit values")
+        key = key.astype(np.uint32)
+    per_block = to_state(key)
+    if per_block.shape[1] != n:
+        raise ValueError("per-block keys must match the number of blocks")
+    return per_block
+
+# ------------------- Layers -------------------
+
+def sbox(x: np.ndarray):
+    a, b, c, d = x[0].copy(), x[1].copy(), x[2].copy(), x[3].copy()
+    a ^= b & c; b ^= a | d; d ^= b | c; c ^= b & d; b ^= a | c; a ^= b | d
+    x[0], x[1], x[2], x[3] = b, c, d, a
+    a, b, c, d = x[4].copy(), x[5].copy(), x[6].copy(), x[7].copy()
+    a ^= b & c; b ^= a | d; d ^= b | c; c ^= b & d; b ^= a | c; a ^= b | d
+    x[4], x[5], x[6], x[7] = d, b, a, c
+
+def sbox_inv(x: np.ndarray):
+    b, c, d, a = x[0].copy(), x[1].copy(), x[2].copy(), x[3].copy()
+    a ^= b | d; b ^= a | c; c ^= b & d; d ^= b | c; b ^= a | d; a ^= b & c
+    x[0], x[1], x[2], x[3] = a, b, c, d
+    d, b, a, c = x[4].copy(), x[5].copy(), x[6].copy(), x[7].copy()
+    a ^= b | d; b ^= a | c; c ^= b & d; d ^= b | c; b ^= a | d; a ^= b & c
+    x[4], x[5], x[6], x[7] = a, b, c, d
+
+def _mul2(x: np.ndarray, i: int):
+    # (t0, t1) -> (t1, t0 ^ t1) on rows i, i+1
+    t0 = x[i].copy()
+    x[i] = x[i + 1]
+    x[i + 1] ^= t0
+
+def _inv_mul2(x: np.ndarray, i: int):
+    # (u0, u1) -> (u1 ^ u0, u0)
+    u0 = x[i].copy()
+    x[i] ^= x[i + 1]
+    x[i + 1] = u0
+
+def mds(x: np.ndarray):
+    # pairs A = rows 0,1  B = 2,3  C = 4,5  D = 6,7
+    x[4:6] ^= x[6:8]; x[0:2] ^= x[2:4]
+    _mul2(x, 2); _mul2(x, 6)
+    x[2:4] ^= x[4:6]; x[6:8] ^= x[0:2]
+    _mul2(x, 0); _mul2(x, 0); _mul2(x, 4); _mul2(x, 4)
+    x[4:6] ^= x[6:8]; x[0:2] ^= x[2:4]
+    x[2:4] ^= x[4:6]; x[6:8] ^= x[0:2]
+
+def inv_mds(x: np.ndarray):
+    x[6:8] ^= x[0:2]; x[2:4] ^= x[4:6]
+    x[0:2] ^= x[2:4]; x[4:6] ^= x[6:8]
+    _inv_mul2(x, 0); _inv_mul2(x, 0); _inv_mul2(x, 4); _inv_mul2(x, 4)
+    x[6:8] ^= x[0:2]; x[2:4] ^= x[4:6]
+    _inv_mul2(x, 2); _inv_mul2(x, 6)
+    x[0:2] ^= x[2:4]; x[4:6] ^= x[6:8]
+
+def SR_slice(x: np.ndarray):
+    # abcd -> badc on rows 4..7 (an involution)
+    y = x[4:8]
+    y[:] = ((y & 0b1010) >> 1) | ((y & 0b0101) << 1)
+
+def SR_sheet(x: np.ndarray):
+    # abcd -> cdab on rows 4..7 (an involution)
+    y = x[4:8]
+    y[:] = ((y << 2) | (y >> 2)) & 0xF
+
+inv_SR_slice = SR_slice
+inv_SR_sheet = SR_sheet
+
+def rotate_key(k: np.ndarray) -> np.ndarray:
+    """Every key nibble rotated left by 3, as in xor_key_rotated."""
+    return ((k << 3) | (k >> 1)) & 0xF
+
+# ------------------- Encrypt / Decrypt -------------------
+
+def encrypt_toy_batch(plaintexts: Blocks, key: Key, R: int = 1) -> np.ndarray:
+    """Array version of toy.encrypt_toy_debug."""
+    packed = np.asarray(plaintexts).ndim == 1
+    x = to_state(plaintexts)
+    k = key_state(key, x.shape[1])
+    k_rot = rotate_key(k)
+    rc0, rc1 = ref.make_round_constants(R)
+
+    x ^= k
+    for r in range(R):
+        # Even round
+        sbox(x)
+        mds(x)
+
+        # Odd round
+        sbox(x)
+        if (r & 1) == 0:
+            SR_slice(x); mds(x); inv_SR_slice(x)
+            x[0] ^= rc0[r]; x[4] ^= rc1[r]
+            x ^= k_rot
+        else:
+            SR_sheet(x); mds(x); inv_SR_sheet(x)
+            x[0] ^= rc0[r]; x[4] ^= rc1[r]
+            x ^= k
+    return from_state(x, packed)
+
+def decrypt_toy_batch(ciphertexts: Blocks, key: Key, R: int = 1) -> np.ndarray:
+    """Array version of toy.decrypt_toy_debug."""
+    packed = np.asarray(ciphertexts).ndim == 1
+    x = to_state(ciphertexts)
+    k = key_state(key, x.shape[1])
+    k_rot = rotate_key(k)
+    rc0, rc1 = ref.make_round_constants(R)
+
+    for r in range(R - 1, -1, -1):
+        # Odd round
+        if (r & 1) == 0:
+            x ^= k_rot
+            x[0] ^= rc0[r]; x[4] ^= rc1[r]
+            SR_slice(x); inv_mds(x); inv_SR_slice(x)
+        else:
+            x ^= k
+            x[0] ^= rc0[r]; x[4] ^= rc1[r]
+            SR_sheet(x); inv_mds(x); inv_SR_sheet(x)
+        sbox_inv(x)
+
+        # Even round
+        inv_mds(x)
+        sbox_inv(x)
+    x ^= k
+    return from_state(x, packed)
+
+# ------------------- Main -------------------
+if __name__ == "__main__":
+    import time
+
+    R = 3
+    N = 1 << 20
+    rng = np.random.default_rng(1)
+    P = rng.integers(0, 16, size=(N, 8), dtype=np.uint8)
+    K = [0xA, 1, 0xB, 2, 0xC, 3, 0xD, 4]
+
+    t0 = time.perf_counter()
+    C = encrypt_toy_batch(P, K, R)
+    t1 = time.perf_counter()
+    print(f"{N} blocks in {t1 - t0:.2f}s ({N / (t1 - t0):.0f} blocks/s)")
+    print("Round trip ok:", np.array_equal(decrypt_toy_batch(C, K, R), P))
+    print("Matches toy.py:", all(C[i].tolist() == ref.encrypt_toy_debug(P[i].tolist(), K, R)
+                                 for i in range(1000)))
@@ -0,0 +1,234 @@
+# toy_codebook.py
+"""
+Full codebooks of the toy cipher on disk.
+
+The toy block is 32 bits, so for one (key, R) the whole permutation fits
+in a file of 2^32 little-endian uint32 values (16 GiB): entry x of the
+"enc" codebook is E_K(x), entry y of the "dec" codebook is D_K(y). Blocks
+and keys are 32-bit ints with nibble 0 as the most significant nibble,
+the same packing as toy_table.py and the Brownie hex wrappers.
+
+The file is memory-mapped and filled in chunks by a process pool. Each
+chunk is encrypted with NumPy versions of the toy_table T-tables and
+written straight into the map. Finished chunks are recorded in a JSON
+sidecar, so an interrupted build resumes where it stopped and a finished
+codebook is simply reopened on the next run.
+
+Usage:
+    python3 toy_codebook.py build --key A1B2C3D4 --rounds 3 [--direction dec] [--workers N]
+    python3 toy_codebook.py lookup --key A1B2C3D4 --rounds 3 01234567
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+try:
+    from . import toy_table         # imported as toy.toy_codebook
+except ImportError:
+    import toy_table                # run from inside toy/
+
+N_BLOCKS = 1 << 32
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "codebooks")
+DEFAULT_CHUNK_BITS = 24
+DIRECTIONS = ("enc", "dec")
+
+# ------------------- Vectorised T-tables -------------------
+
+def _np(tables) -> np.ndarray:
+    return np.array(tables, dtype=np.uint32)
+
+TO_COL, FROM_COL = _np(toy_table.TO_COL), _np(toy_table.FROM_COL)
+T_EVEN, T_SLICE, T_SHEET = _np(toy_table.T_EVEN), _np(toy_table.T_SLICE), _np(toy_table.T_SHEET)
+T_INV_EVEN = _np(toy_table.T_INV_EVEN)
+T_INV_SLICE, T_INV_SHEET = _np(toy_table.T_INV_SLICE), _np(toy_table.T_INV_SHEET)
+L_INV_SLICE, L_INV_SHEET = _np(toy_table.L_INV_SLICE), _np(toy_table.L_INV_SHEET)
+T_SBOX_INV = _np(toy_table.T_SBOX_INV)
+
+def apply(T: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """XOR of the four byte lookups T[k][byte k of x], for a uint32 array x."""
+    out = T[0][x & 0xFF]
+    out ^= T[1][(x >> 8) & 0xFF]
+    out ^= T[2][(x >> 16) & 0xFF]
+    out ^= T[3][x >> 24]
+    return out
+
+def encrypt_array(key: toy_table.ToyKey, v: np.ndarray) -> np.ndarray:
+    """Encrypt a uint32 array of nibble-major blocks; mirrors ToyKey.encrypt_int."""
+    x = apply(TO_COL, v)
+    x ^= np.uint32(key.whitening)
+    for r, rk in enumerate(key.enc_keys):
+        x = apply(T_EVEN, x)
+        x = apply(T_SLICE if (r & 1) == 0 else T_SHEET, x)
+        x ^= np.uint32(rk)
+    return apply(FROM_COL, x)
+
+def decrypt_array(key: toy_table.ToyKey, v: np.ndarray) -> np.ndarray:
+    """Decrypt a uint32 array of nibble-major blocks; mirrors ToyKey.decrypt_int."""
+    x = apply(TO_COL, v)
+    last = key.R - 1
+    if last >= 0:
+        x ^= np.uint32(key.enc_keys[last])
+        x = apply(L_INV_SLICE if (last & 1) == 0 else L_INV_SHEET, x)
+        for r in range(last, -1, -1):
+            x = apply(T_INV_EVEN, x)
+            if r > 0:
+                x = apply(T_INV_SLICE if ((r - 1) & 1) == 0 else T_INV_SHEET, x)
+                x ^= np.uint32(key.dec_keys[r - 1])
+        x = apply(T_SBOX_INV, x)
+    x ^= np.uint32(key.whitening)
+    return apply(FROM_COL, x)
+
+# ------------------- Files -------------------
+
+def codebook_path(key: int, R: int, direction: str = "enc", directory: str = DEFAULT_DIR) -> str:
+    if direction not in DIRECTIONS:
+        raise ValueError("direction must be 'enc' or 'dec'")
+    return os.path.join(directory, f"toy_R{R}_K{key:08x}.{direction}.u32")
+
+def _status_path(path: str) -> str:
+    return path + ".json"
+
+def read_status(path: str) -> Optional[dict]:
+    try:
+        with open(_status_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_status(path: str, status: dict):
+    tmp = _status_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, _status_path(path))
+
+def is_complete(key: int, R: int, direction: str = "enc", directory: str = DEFAULT_DIR) -> bool:
+    status = read_status(codebook_path(key, R, direction, directory))
+    return bool(status) and len(status["done"]) == 1 << (32 - status["chunk_bits"])
+
+# ------------------- Worker -------------------
+
+# per-process state set up by _init_worker
+_job = {}
+
+def _init_worker(path: str, key: int, R: int, direction: str):
+    _job.update(
+        out=np.memmap(path, dtype="<u4", mode="r+", shape=(N_BLOCKS,)),
+        key=toy_table.ToyKey(key, R),
+        fn=encrypt_array if direction == "enc" else decrypt_array,
+    )
+
+def _process_chunk(chunk):
+    """Fill codebook[start:start+size] and flush it; returns the chunk index."""
+    index, start, size = chunk
+    v = np.arange(start, start + size, dtype=np.uint32)
+    out = _job["out"]
+    out[start:start + size] = _job["fn"](_job["key"], v)
+    out.flush()
+    return index
+
+# ------------------- Driver -------------------
+
+def build_codebook(key: int, R: int, direction: str = "enc", directory: str = DEFAULT_DIR,
+                   workers: int = None, chunk_bits: int = DEFAULT_CHUNK_BITS,
+                   chunks: Optional[Iterable[int]] = None, progress: bool = True) -> str:
+    """
+    Compute the (key, R) codebook into its file, skipping chunks already
+    done. 'chunks' restricts the run to some chunk indices (of size
+    2^chunk_bits). Returns the file path.
+    """
+    path = codebook_path(key, R, direction, directory)
+    os.makedirs(directory, exist_ok=True)
+    status = read_status(path)
+    if status is None or not os.path.exists(path):
+        status = {"key": f"{key:08x}", "R": R, "direction": direction,
+                  "chunk_bits": chunk_bits, "done": []}
+        # sparse file of the final size; pages are allocated as chunks land
+        with open(path, "wb") as f:
+            f.truncate(N_BLOCKS * 4)
+        _write_status(path, status)
+    chunk_bits = status["chunk_bits"]
+    size = 1 << chunk_bits
+    n_chunks = 1 << (32 - chunk_bits)
+
+    done = set(status["done"])
+    wanted = range(n_chunks) if chunks is None else chunks
+    work = [(i, i * size, size) for i in wanted if i not in done]
+    if not work:
+        return path
+
+    workers = workers or os.cpu_count() or 1
+    init_args = (path, key, R, direction)
+    t0 = time.perf_counter()
+    if workers == 1:
+        _init_worker(*init_args)
+        results = map(_process_chunk, work)
+        pool = None
+    else:
+        pool = Pool(workers, initializer=_init_worker, initargs=init_args)
+        results = pool.imap_unordered(_process_chunk, work)
+    try:
+        for n, index in enumerate(results, 1):
+            done.add(index)
+            status["done"] = sorted(done)
+            _write_status(path, status)
+            if progress:
+                rate = n * size / max(time.perf_counter() - t0, 1e-9)
+                sys.stderr.write(f"\r{len(done)}/{n_chunks} chunks  {rate / 1e6:8.2f} M blocks/s")
+                sys.stderr.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            _job.clear()
+        if progress:
+            sys.stderr.write("\n")
+    return path
+
+def load_codebook(key: int, R: int, direction: str = "enc", directory: str = DEFAULT_DIR) -> np.memmap:
+    """Open a finished codebook read-only; codebook[x] is E_K(x) (or D_K(x))."""
+    if not is_complete(key, R, direction, directory):
+        raise FileNotFoundError(f"no complete {direction} codebook for key {key:08x}, R={R}")
+    return np.memmap(codebook_path(key, R, direction, directory), dtype="<u4", mode="r",
+                     shape=(N_BLOCKS,))
+
+def codebook(key: int, R: int, direction: str = "enc", directory: str = DEFAULT_DIR,
+             **build_args) -> np.memmap:
+    """Open the (key, R) codebook, building (or finishing) it first if needed."""
+    if not is_complete(key, R, direction, directory):
+        build_codebook(key, R, direction, directory, **build_args)
+    return load_codebook(key, R, direction, directory)
+
+# ------------------- Main -------------------
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Toy cipher full-codebook files")
+    parser.add_argument("command", choices=["build", "lookup"])
+    parser.add_argument("blocks", nargs="*", help="blocks to look up, as 8 hex characters")
+    parser.add_argument("--key", required=True, help="32-bit key as 8 hex characters")
+    parser.add_argument("--rounds", type=int, default=1, help="rounds R (default 1)")
+    parser.add_argument("--direction", choices=DIRECTIONS, default="enc")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="codebook directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk-bits", type=int, default=DEFAULT_CHUNK_BITS,
+                        help="log2 of blocks per work unit (default 24)")
+    args = parser.parse_args(argv)
+    key = int(args.key, 16)
+
+    if args.command == "build":
+        path = build_codebook(key, args.rounds, args.direction, args.dir,
+                              workers=args.workers, chunk_bits=args.chunk_bits)
+        print(path)
+    else:
+        book = load_codebook(key, args.rounds, args.direction, args.dir)
+        for block in args.blocks:
+            print(f"{block} -> {int(book[int(block, 16)]):08x}")
+
+if __name__ == "__main__":
+    main()
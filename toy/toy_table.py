@@ -0,0 +1,229 @@
+# toy_table.py
+"""
+Table-driven toy cipher on packed 32-bit integers.
+
+toy.py keeps the state as 8 nibbles and the S-box is bitsliced across
+them: bit k of nibbles 0..3 is one sigma_0 input and bit k of nibbles
+4..7 one sigma_1 input. mds is an XOR network over whole nibbles, so it
+also acts on each bit position k separately. Here the state is therefore
+stored column-major: byte k of the integer (bits 8k .. 8k+7) is
+"column k", and bit i of column k is bit k of nibble i.
+
+In this layout
+  * the even half-round (S-box, mds) maps every column on its own, so it
+    is 4 byte lookups XORed together (T-tables);
+  * the odd half-round (S-box, SR, mds, SR^-1) mixes only pairs of
+    columns; each input column still contributes a fixed 32-bit pattern,
+    so it is 4 lookups as well;
+  * round constants and the (rotated) key become one precomputed XOR.
+Decryption is arranged the same way: inverse S-box followed by the
+inverse linear layer (and the next round key, pushed through it).
+
+The tables are generated from the reference functions in toy.py, so both
+engines agree by construction. Plaintexts, ciphertexts and keys are
+either 8-nibble lists (as in toy.py) or 32-bit ints with nibble 0 as the
+most significant nibble (as in the Brownie hex wrappers).
+"""
+from functools import lru_cache
+from typing import List, Sequence, Union
+
+try:
+    from . import toy as ref            # imported as toy.toy_table
+except ImportError:
+    import toy as ref                   # run from inside toy/
+
+Block = Union[int, Sequence[int]]
+
+# ------------------- Layout conversion -------------------
+
+def nibbles_to_int(state: Sequence[int]) -> int:
+    v = 0
+    for n in state:
+        v = (v << 4) | (n & 0xF)
+    return v
+
+def int_to_nibbles(v: int) -> List[int]:
+    return [(v >> (28 - 4*i)) & 0xF for i in range(8)]
+
+def _nibble_bit_to_column_bit(pos: int) -> int:
+    # bit b of nibble i sits at 4*(7-i)+b in the nibble-major int
+    i, b = 7 - pos // 4, pos % 4
+    return 8*b + i
+
+def _byte_tables(bit_map) -> List[List[int]]:
+    tables = []
+    for j in range(4):
+        t = [0] * 256
+        for v in range(256):
+            out = 0
+            for bit in range(8):
+                if (v >> bit) & 1:
+                    out |= 1 << bit_map(8*j + bit)
+            t[v] = out
+        tables.append(t)
+    return tables
+
+TO_COL = _byte_tables(_nibble_bit_to_column_bit)
+FROM_COL = _byte_tables(lambda pos: 4*(7 - pos % 8) + pos // 8)
+
+def to_columns(v: int) -> int:
+    """Nibble-major 32-bit int -> column-major int."""
+    t0, t1, t2, t3 = TO_COL
+    return t0[v & 0xFF] ^ t1[(v >> 8) & 0xFF] ^ t2[(v >> 16) & 0xFF] ^ t3[v >> 24]
+
+def from_columns(x: int) -> int:
+    """Column-major int -> nibble-major 32-bit int."""
+    t0, t1, t2, t3 = FROM_COL
+    return t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+
+# ------------------- Table generation -------------------
+
+def _via_nibbles(f, x: int) -> int:
+    """Apply a toy.py function (8-nibble list in, list out) to a column-major int."""
+    return to_columns(nibbles_to_int(f(int_to_nibbles(from_columns(x)))))
+
+def column_tables(f) -> List[List[int]]:
+    """
+    T[k][c] = f(state with column k = c and all other columns zero).
+    f must be column-wise (S-box or its inverse, which map 0 to 0)
+    followed by a linear map; then f(x) = XOR over k of T[k][column k].
+    """
+    return [[_via_nibbles(f, c << (8*k)) for c in range(256)] for k in range(4)]
+
+def _even(s):
+    return ref.mds(ref.sbox_kriti(s))
+
+def _odd_slice(s):
+    return ref.inv_SR_slice(ref.mds(ref.SR_slice(ref.sbox_kriti(s))))
+
+def _odd_sheet(s):
+    return ref.inv_SR_sheet(ref.mds(ref.SR_sheet(ref.sbox_kriti(s))))
+
+def _lin_inv_slice(s):
+    return ref.inv_SR_slice(ref.inv_mds(ref.SR_slice(s)))
+
+def _lin_inv_sheet(s):
+    return ref.inv_SR_sheet(ref.inv_mds(ref.SR_sheet(s)))
+
+T_EVEN = column_tables(_even)
+T_SLICE = column_tables(_odd_slice)
+T_SHEET = column_tables(_odd_sheet)
+
+# decryption: S^-1 then mds^-1; S^-1 then the inverse odd linear layer;
+# the inverse odd linear layer alone; S^-1 alone
+T_INV_EVEN = column_tables(lambda s: ref.inv_mds(ref.sbox_inv_kriti(s)))
+T_INV_SLICE = column_tables(lambda s: _lin_inv_slice(ref.sbox_inv_kriti(s)))
+T_INV_SHEET = column_tables(lambda s: _lin_inv_sheet(ref.sbox_inv_kriti(s)))
+L_INV_SLICE = column_tables(_lin_inv_slice)
+L_INV_SHEET = column_tables(_lin_inv_sheet)
+T_SBOX_INV = column_tables(ref.sbox_inv_kriti)
+
+def apply(T: List[List[int]], x: int) -> int:
+    t0, t1, t2, t3 = T
+    return t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+
+# ------------------- Key Schedule -------------------
+
+class ToyKey:
+    """
+    Key context for one (key, R). enc_keys[r] is the round constant and
+    round key of round r in column layout; dec_keys[r] is the same value
+    pushed through the inverse odd linear layer of round r.
+    """
+
+    def __init__(self, key: Block, R: int = 1):
+        key = int_to_nibbles(key) if isinstance(key, int) else [k & 0xF for k in key]
+        self.R = R
+        self.whitening = to_columns(nibbles_to_int(key))
+        rc0, rc1 = ref.make_round_constants(R)
+        rotated = [ref.rol4(k, 3) for k in key]
+        self.enc_keys = []
+        for r in range(R):
+            rk = list(rotated if (r & 1) == 0 else key)
+            rk[0] ^= rc0[r]
+            rk[4] ^= rc1[r]
+            self.enc_keys.append(to_columns(nibbles_to_int(rk)))
+        self.dec_keys = [apply(L_INV_SLICE if (r & 1) == 0 else L_INV_SHEET, k)
+                         for r, k in enumerate(self.enc_keys)]
+
+    def encrypt_columns(self, x: int) -> int:
+        e0, e1, e2, e3 = T_EVEN
+        s0, s1, s2, s3 = T_SLICE
+        h0, h1, h2, h3 = T_SHEET
+        x ^= self.whitening
+        for r, rk in enumerate(self.enc_keys):
+            x = e0[x & 0xFF] ^ e1[(x >> 8) & 0xFF] ^ e2[(x >> 16) & 0xFF] ^ e3[x >> 24]
+            if (r & 1) == 0:
+                x = s0[x & 0xFF] ^ s1[(x >> 8) & 0xFF] ^ s2[(x >> 16) & 0xFF] ^ s3[x >> 24] ^ rk
+            else:
+                x = h0[x & 0xFF] ^ h1[(x >> 8) & 0xFF] ^ h2[(x >> 16) & 0xFF] ^ h3[x >> 24] ^ rk
+        return x
+
+    def decrypt_columns(self, x: int) -> int:
+        e0, e1, e2, e3 = T_INV_EVEN
+        R = self.R
+        if R == 0:
+            return x ^ self.whitening
+        last = R - 1
+        x = apply(L_INV_SLICE if (last & 1) == 0 else L_INV_SHEET, x ^ self.enc_keys[last])
+        for r in range(last, -1, -1):
+            # S^-1 and mds^-1 of round r
+            x = e0[x & 0xFF] ^ e1[(x >> 8) & 0xFF] ^ e2[(x >> 16) & 0xFF] ^ e3[x >> 24]
+            # S^-1 of round r, then key and inverse odd layer of round r - 1
+            if r > 0:
+                o0, o1, o2, o3 = T_INV_SLICE if ((r - 1) & 1) == 0 else T_INV_SHEET
+                x = o0[x & 0xFF] ^ o1[(x >> 8) & 0xFF] ^ o2[(x >> 16) & 0xFF] ^ o3[x >> 24] \
+                    ^ self.dec_keys[r - 1]
+        return apply(T_SBOX_INV, x) ^ self.whitening
+
+    def encrypt_int(self, v: int) -> int:
+        return from_columns(self.encrypt_columns(to_columns(v)))
+
+    def decrypt_int(self, v: int) -> int:
+        return from_columns(self.decrypt_columns(to_columns(v)))
+
+@lru_cache(maxsize=4096)
+def toy_key(key: Union[int, tuple], R: int = 1) -> ToyKey:
+    return ToyKey(key, R)
+
+# ------------------- Drop-in API -------------------
+
+def _key_arg(key: Block):
+    return key if isinstance(key, int) else tuple(key)
+
+def encrypt_int(v: int, key: Block, R: int = 1) -> int:
+    return toy_key(_key_arg(key), R).encrypt_int(v)
+
+def decrypt_int(v: int, key: Block, R: int = 1) -> int:
+    return toy_key(_key_arg(key), R).decrypt_int(v)
+
+def encrypt_toy(plaintext: Sequence[int], key: Block, R: int = 1) -> List[int]:
+    """Same inputs and output as toy.encrypt_toy_debug."""
+    return int_to_nibbles(encrypt_int(nibbles_to_int(plaintext), key, R))
+
+def decrypt_toy(ciphertext: Sequence[int], key: Block, R: int = 1) -> List[int]:
+    """Same inputs and output as toy.decrypt_toy_debug."""
+    return int_to_nibbles(decrypt_int(nibbles_to_int(ciphertext), key, R))
+
+# ------------------- Main -------------------
+if __name__ == "__main__":
+    import random
+    import time
+
+    R = 3
+    pairs = [([random.randrange(16) for _ in range(8)], [random.randrange(16) for _ in range(8)])
+             for _ in range(2000)]
+    ok = all(encrypt_toy(p, k, R) == ref.encrypt_toy_debug(p.copy(), k, R)
+             and decrypt_toy(encrypt_toy(p, k, R), k, R) == p for p, k in pairs)
+    print("Matches toy.py:", ok)
+
+    key = toy_key(0xA1B2C3D4, R)
+    N = 100000
+    t0 = time.perf_counter()
+    for v in range(N):
+        key.encrypt_int(v)
+    t1 = time.perf_counter()
+    for p, k in pairs[:2000]:
+        ref.encrypt_toy_debug(p.copy(), k, R)
+    t2 = time.perf_counter()
+    print(f"table: {(t1 - t0) / N * 1e6:.2f} us/block, toy.py: {(t2 - t1) / 2000 * 1e6:.2f} us/block")
@@ -0,0 +1,189 @@
+# integral.py
+"""
+Integral (saturation) distinguishers for the toy cipher.
+
+An input pattern gives one letter per nibble: 'A' (active, takes all 16
+values) or 'C' (constant). The structured set of a pattern with k active
+nibbles has 16^k plaintexts; element i spreads the 4k bits of i over
+the active nibbles, and the set is encrypted in chunks with toy_batch.py.
+
+Nothing is stored per plaintext. Every structure (one key, one choice of
+the constant nibbles) keeps running accumulators over its ciphertexts:
+  * XOR of all ciphertexts            -> balanced nibbles ('B')
+  * OR of (c ^ first ciphertext)      -> constant nibbles ('C')
+  * per-nibble value counts           -> nibbles taking every value
+                                         equally often ('A')
+An output nibble gets the strongest letter that holds in every structure
+(C, then A, then B), otherwise '?'.
+
+Balance is inherited by larger patterns (a larger set is a union of
+smaller ones), so the sweep only enumerates patterns up to --max-active
+nibbles.
+
+Usage:
+    python3 integral.py check AAAACCCC --rounds 2
+    python3 integral.py sweep --rounds 1 2 3 --max-active 4
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import combinations
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Add parent directory to path to import toy
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from toy import toy_batch
+
+CHUNK_BLOCKS = 1 << 20
+
+# ------------------- Patterns -------------------
+
+def parse_pattern(pattern: str) -> List[int]:
+    """Indices of the active nibbles of e.g. 'AAAACCCC'."""
+    pattern = pattern.upper()
+    if len(pattern) != 8 or set(pattern) - set("AC"):
+        raise ValueError("pattern must be 8 letters, A (active) or C (constant)")
+    return [i for i, c in enumerate(pattern) if c == "A"]
+
+def pattern_string(active: Sequence[int]) -> str:
+    return "".join("A" if i in active else "C" for i in range(8))
+
+def structured_set(active: Sequence[int], start: int, count: int) -> np.ndarray:
+    """
+    Elements start .. start+count-1 of the structured set, as packed
+    uint32 values of the active nibbles (constants 0).
+    """
+    i = np.arange(start, start + count, dtype=np.uint32)
+    v = np.zeros(count, dtype=np.uint32)
+    for j, nibble in enumerate(active):
+        v |= ((i >> np.uint32(4*j)) & np.uint32(0xF)) << np.uint32(28 - 4*nibble)
+    return v
+
+# ------------------- Accumulators -------------------
+
+class Accumulators:
+    """Running properties of S structures over their ciphertexts."""
+
+    def __init__(self, structures: int):
+        self.S = structures
+        self.xor = np.zeros(structures, dtype=np.uint32)
+        self.diff = np.zeros(structures, dtype=np.uint32)
+        self.first = None
+        self.counts = np.zeros((8, structures * 16), dtype=np.int64)
+
+    def update(self, C: np.ndarray):
+        """C is an (S, m) array of ciphertexts, m consecutive set elements per structure."""
+        if self.first is None:
+            self.first = C[:, 0].copy()
+        self.xor ^= np.bitwise_xor.reduce(C, axis=1)
+        self.diff |= np.bitwise_or.reduce(C ^ self.first[:, None], axis=1)
+        base = (np.arange(self.S, dtype=np.int64) * 16)[:, None]
+        for i in range(8):
+            vals = ((C >> np.uint32(28 - 4*i)) & np.uint32(0xF)).astype(np.int64)
+            self.counts[i] += np.bincount((base + vals).ravel(), minlength=self.S * 16)
+
+    def properties(self) -> str:
+        out = []
+        for i in range(8):
+            shift = np.uint32(28 - 4*i)
+            counts = self.counts[i].reshape(self.S, 16)
+            if not ((self.diff >> shift) & np.uint32(0xF)).any():
+                out.append("C")
+            elif (counts == counts[:, :1]).all():
+                out.append("A")
+            elif not ((self.xor >> shift) & np.uint32(0xF)).any():
+                out.append("B")
+            else:
+                out.append("?")
+        return "".join(out)
+
+# ------------------- Engine -------------------
+
+def integral_properties(active: Sequence[int], R: int, keys: np.ndarray,
+                        constants: int = 2, seed: int = 0) -> str:
+    """
+    Output letters of the pattern over every key in 'keys' (uint32) and
+    'constants' random choices of the constant nibbles per key.
+    """
+    rng = np.random.default_rng(seed)
+    size = 1 << (4 * len(active))
+    active_mask = np.uint32(sum(0xF << (28 - 4*i) for i in active))
+    # one structure per (key, constants)
+    S = len(keys) * constants
+    base = rng.integers(0, 1 << 32, size=S, dtype=np.uint32) & ~active_mask
+    struct_keys = np.repeat(np.asarray(keys, dtype=np.uint32), constants)
+
+    acc = Accumulators(S)
+    m = max(1, min(size, CHUNK_BLOCKS // S))
+    for start in range(0, size, m):
+        count = min(m, size - start)
+        P = (base[:, None] ^ structured_set(active, start, count)[None, :]).ravel()
+        C = toy_batch.encrypt_toy_batch(P, np.repeat(struct_keys, count), R)
+        acc.update(C.reshape(S, count))
+    return acc.properties()
+
+def inherited(pattern: str, results: Dict[str, str]) -> str:
+    """
+    Letters implied by the patterns with one active nibble less: any
+    property of a sub-pattern (C and A included) makes the nibble balanced.
+    """
+    out = ["?"] * 8
+    for i, c in enumerate(pattern):
+        if c == "A":
+            sub = results.get(pattern[:i] + "C" + pattern[i + 1:], "?" * 8)
+            for j, q in enumerate(sub):
+                if q != "?":
+                    out[j] = "B"
+    return "".join(out)
+
+def sweep(rounds: Sequence[int], max_active: int, n_keys: int, constants: int,
+          seed: int = 0, out=sys.stdout) -> Dict[int, Dict[str, str]]:
+    """Properties of every pattern with 1..max_active active nibbles, per round count."""
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, 1 << 32, size=n_keys, dtype=np.uint32)
+    results = {}
+    for R in rounds:
+        t0 = time.perf_counter()
+        results[R] = {}
+        for k in range(1, max_active + 1):
+            for active in combinations(range(8), k):
+                props = integral_properties(active, R, keys, constants, seed)
+                results[R][pattern_string(active)] = props
+        found = {p: q for p, q in results[R].items() if q != "?" * 8}
+        new = {p: q for p, q in found.items() if q != inherited(p, results[R])}
+        out.write(f"R = {R}: {len(found)}/{len(results[R])} patterns with a property, "
+                  f"{len(new)} not implied by a smaller pattern ({time.perf_counter() - t0:.1f}s)\n")
+        for p, q in sorted(new.items(), key=lambda pq: (pq[0].count("A"), pq[0])):
+            out.write(f"  {p} -> {q}\n")
+    return results
+
+# ------------------- Main -------------------
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Integral distinguishers for the toy cipher")
+    parser.add_argument("command", choices=["check", "sweep"])
+    parser.add_argument("pattern", nargs="?", help="input pattern for 'check', e.g. AAAACCCC")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--max-active", type=int, default=4, help="largest pattern in the sweep")
+    parser.add_argument("--keys", type=int, default=8, help="random keys per pattern")
+    parser.add_argument("--constants", type=int, default=2, help="random constants per key")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        if not args.pattern:
+            parser.error("check needs a pattern")
+        active = parse_pattern(args.pattern)
+        keys = np.random.default_rng(args.seed).integers(0, 1 << 32, size=args.keys, dtype=np.uint32)
+        for R in args.rounds:
+            print(f"R = {R}: {args.pattern.upper()} -> "
+                  f"{integral_properties(active, R, keys, args.constants, args.seed)}")
+    else:
+        sweep(args.rounds, args.max_active, args.keys, args.constants, args.seed)
+
+if __name__ == "__main__":
+    main()